@@ -1,31 +1,73 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
 import random
-import xml.etree.ElementTree as ET
-from PIL import Image, ImageTk
-from graphviz import Digraph
+import math
 import os
-import tempfile
+import sys
+import gc
+
+# Las dependencias de la interfaz, los reportes, la carga XML y el modo
+# paralelo se importan al usarse, para que el núcleo de simulación arranque
+# rápido y funcione en equipos sin Tk, PIL ni graphviz.
+tk = ttk = messagebox = filedialog = Image = ImageTk = None
+
+def _importar_interfaz():
+    global tk, ttk, messagebox, filedialog, Image, ImageTk
+    import tkinter as tk
+    from tkinter import ttk, messagebox, filedialog
+    from PIL import Image, ImageTk
+
+def _nuevo_digraph(*args, **kwargs):
+    from graphviz import Digraph
+    return Digraph(*args, **kwargs)
 
 # ==================== ESTRUCTURAS DE DATOS PERSONALIZADAS ====================
 
 class Nodo:
+    __slots__ = ('dato', 'siguiente', 'anterior')
+
     def __init__(self, dato):
         self.dato = dato
         self.siguiente = None
+        self.anterior = None
 
 class ListaEnlazada:
     def __init__(self):
         self.cabeza = None
+        self.cola = None
         self.longitud = 0
     
-    def __getitem__(self, index):
-        if index >= self.longitud:
+    def _normalizar_indice(self, index):
+        if index < 0:
+            index += self.longitud
+        if index < 0 or index >= self.longitud:
             raise IndexError("Índice fuera de rango")
-        actual = self.cabeza
-        for _ in range(index):
-            actual = actual.siguiente
-        return actual.dato
+        return index
+
+    def _nodo_en(self, index):
+        """Ubica el nodo recorriendo desde el extremo más cercano"""
+        index = self._normalizar_indice(index)
+        if index < self.longitud // 2:
+            actual = self.cabeza
+            for _ in range(index):
+                actual = actual.siguiente
+        else:
+            actual = self.cola
+            for _ in range(self.longitud - 1 - index):
+                actual = actual.anterior
+        return actual
+
+    def __getitem__(self, index):
+        return self._nodo_en(index).dato
+
+    def __getstate__(self):
+        # Serializar los datos en orden, no la cadena de nodos (evita la recursión de pickle)
+        return {'datos': list(self)}
+
+    def __setstate__(self, estado):
+        self.__init__()
+        self.agregar_varios(estado['datos'])
+
+    def __setitem__(self, index, dato):
+        self._nodo_en(index).dato = dato
 
     def sum(self):
         total = 0
@@ -40,11 +82,26 @@ class ListaEnlazada:
         if not self.cabeza:
             self.cabeza = nuevo_nodo
         else:
-            actual = self.cabeza
-            while actual.siguiente:
-                actual = actual.siguiente
-            actual.siguiente = nuevo_nodo
+            nuevo_nodo.anterior = self.cola
+            self.cola.siguiente = nuevo_nodo
+        self.cola = nuevo_nodo
         self.longitud += 1
+
+    def agregar_varios(self, datos):
+        """Agrega al final todos los datos de un iterable en una sola pasada"""
+        cola = self.cola
+        agregados = 0
+        for dato in datos:
+            nuevo_nodo = Nodo(dato)
+            if cola is None:
+                self.cabeza = nuevo_nodo
+            else:
+                nuevo_nodo.anterior = cola
+                cola.siguiente = nuevo_nodo
+            cola = nuevo_nodo
+            agregados += 1
+        self.cola = cola
+        self.longitud += agregados
     
     def __iter__(self):
         actual = self.cabeza
@@ -73,43 +130,45 @@ class ListaEnlazada:
         return resultado
 
     def pop(self, index=0):
-        if index >= self.longitud:
-            raise IndexError("Índice fuera de rango")
+        nodo = self._nodo_en(index)
         
-        if index == 0:
-            dato = self.cabeza.dato
-            self.cabeza = self.cabeza.siguiente
+        if nodo.anterior:
+            nodo.anterior.siguiente = nodo.siguiente
         else:
-            actual = self.cabeza
-            for _ in range(index - 1):
-                actual = actual.siguiente
-            dato = actual.siguiente.dato
-            actual.siguiente = actual.siguiente.siguiente
+            self.cabeza = nodo.siguiente
+        if nodo.siguiente:
+            nodo.siguiente.anterior = nodo.anterior
+        else:
+            self.cola = nodo.anterior
         
         self.longitud -= 1
-        return dato
+        return nodo.dato
     
     def obtener_por_indice(self, index):
-        if index >= self.longitud:
-            raise IndexError("Índice fuera de rango")
-        actual = self.cabeza
-        for _ in range(index):
-            actual = actual.siguiente
-        return actual.dato
+        return self._nodo_en(index).dato
 
 class NodoDoble:
+    __slots__ = ('dato', 'siguiente', 'anterior')
+
     def __init__(self, dato):
         self.dato = dato
         self.siguiente = None
         self.anterior = None
 
 class ListaDoblementeEnlazada:
+    """Lista doble que funciona como cola de doble extremo.
+
+    Agregar, extraer y consultar por cualquiera de los extremos es O(1), igual
+    que eliminar un nodo cuyo manejador se conserva (agregar y
+    agregar_al_inicio lo retornan).
+    """
     def __init__(self):
         self.cabeza = None
         self.cola = None
         self.longitud = 0
     
     def agregar(self, dato):
+        """Agrega al final y retorna el nodo creado."""
         nuevo_nodo = NodoDoble(dato)
         if not self.cabeza:
             self.cabeza = nuevo_nodo
@@ -119,6 +178,89 @@ class ListaDoblementeEnlazada:
             self.cola.siguiente = nuevo_nodo
             self.cola = nuevo_nodo
         self.longitud += 1
+        return nuevo_nodo
+
+    def agregar_al_inicio(self, dato):
+        """Agrega al principio y retorna el nodo creado."""
+        nuevo_nodo = NodoDoble(dato)
+        if not self.cabeza:
+            self.cola = nuevo_nodo
+        else:
+            nuevo_nodo.siguiente = self.cabeza
+            self.cabeza.anterior = nuevo_nodo
+        self.cabeza = nuevo_nodo
+        self.longitud += 1
+        return nuevo_nodo
+
+    def primero(self):
+        """Retorna el primer dato sin extraerlo."""
+        if not self.cabeza:
+            raise IndexError("Lista vacía")
+        return self.cabeza.dato
+
+    def ultimo(self):
+        """Retorna el último dato sin extraerlo."""
+        if not self.cola:
+            raise IndexError("Lista vacía")
+        return self.cola.dato
+
+    def eliminar_nodo(self, nodo):
+        """Desenlaza un nodo de esta lista y retorna su dato.
+
+        El nodo debe pertenecer a la lista; queda suelto y no debe reutilizarse.
+        """
+        if nodo.anterior:
+            nodo.anterior.siguiente = nodo.siguiente
+        else:
+            self.cabeza = nodo.siguiente
+        if nodo.siguiente:
+            nodo.siguiente.anterior = nodo.anterior
+        else:
+            self.cola = nodo.anterior
+        nodo.anterior = nodo.siguiente = None
+        self.longitud -= 1
+        return nodo.dato
+
+    def extraer_primero(self):
+        """Elimina y retorna el primer dato (FIFO)."""
+        if not self.cabeza:
+            raise IndexError("Lista vacía")
+        return self.eliminar_nodo(self.cabeza)
+
+    def extraer_ultimo(self):
+        """Elimina y retorna el último dato (LIFO)."""
+        if not self.cola:
+            raise IndexError("Lista vacía")
+        return self.eliminar_nodo(self.cola)
+
+    # Nombres equivalentes a los de collections.deque
+    append = agregar
+    appendleft = agregar_al_inicio
+    popleft = extraer_primero
+    pop = extraer_ultimo
+    
+    def __getstate__(self):
+        return {'datos': list(self)}
+
+    def __setstate__(self, estado):
+        self.__init__()
+        for dato in estado['datos']:
+            self.agregar(dato)
+
+    def extender(self, otra):
+        """Enlaza al final todos los nodos de otra lista en O(1); la otra queda vacía."""
+        if otra.cabeza is None:
+            return
+        if self.cabeza is None:
+            self.cabeza = otra.cabeza
+        else:
+            self.cola.siguiente = otra.cabeza
+            otra.cabeza.anterior = self.cola
+        self.cola = otra.cola
+        self.longitud += otra.longitud
+        otra.cabeza = None
+        otra.cola = None
+        otra.longitud = 0
     
     def __iter__(self):
         actual = self.cabeza
@@ -136,22 +278,23 @@ class ListaDoblementeEnlazada:
         return self.longitud
     
     def eliminar_primer_cliente(self):
-        """Elimina y retorna el primer cliente (FIFO)."""
+        """Elimina y retorna el primer cliente (FIFO), o None si la lista está vacía."""
         if not self.cabeza:
             return None
-        cliente = self.cabeza.dato
-        self.cabeza = self.cabeza.siguiente
-        if self.cabeza:
-            self.cabeza.anterior = None
-        else:
-            self.cola = None
-        self.longitud -= 1
-        return cliente
+        return self.eliminar_nodo(self.cabeza)
 
     def __getitem__(self, index):
-        if index >= self.longitud:
+        if index < 0:
+            index += self.longitud
+        if index < 0 or index >= self.longitud:
             raise IndexError("Índice fuera de rango")
         
+        # Los extremos se leen directo, sin recorrer
+        if index == 0:
+            return self.cabeza.dato
+        if index == self.longitud - 1:
+            return self.cola.dato
+        
         if index < self.longitud // 2:
             actual = self.cabeza
             for _ in range(index):
@@ -163,6 +306,324 @@ class ListaDoblementeEnlazada:
                 
         return actual.dato
 
+class MonticuloMinimo:
+    """Cola de prioridad (montículo binario) que entrega primero la clave menor.
+
+    Las claves deben ser comparables entre sí y no repetirse; el dato asociado
+    nunca se compara."""
+    def __init__(self):
+        self.claves = []
+        self.datos = []
+
+    def __len__(self):
+        return len(self.claves)
+
+    def agregar(self, clave, dato):
+        self.claves.append(clave)
+        self.datos.append(dato)
+        self._subir(len(self.claves) - 1)
+
+    def minimo(self):
+        """Retorna (clave, dato) del menor elemento sin extraerlo."""
+        if len(self.claves) == 0:
+            raise IndexError("Montículo vacío")
+        return self.claves[0], self.datos[0]
+
+    def extraer(self):
+        """Extrae y retorna (clave, dato) del menor elemento."""
+        if len(self.claves) == 0:
+            raise IndexError("Montículo vacío")
+        clave, dato = self.claves[0], self.datos[0]
+        ultima_clave = self.claves.pop()
+        ultimo_dato = self.datos.pop()
+        if len(self.claves) > 0:
+            self.claves[0] = ultima_clave
+            self.datos[0] = ultimo_dato
+            self._bajar(0)
+        return clave, dato
+
+    def reemplazar_minimo(self, clave, dato):
+        """Extrae el menor elemento y agrega (clave, dato) con un solo descenso."""
+        if len(self.claves) == 0:
+            raise IndexError("Montículo vacío")
+        anterior = self.claves[0], self.datos[0]
+        self.claves[0] = clave
+        self.datos[0] = dato
+        self._bajar(0)
+        return anterior
+
+    def _intercambiar(self, i, j):
+        self.claves[i], self.claves[j] = self.claves[j], self.claves[i]
+        self.datos[i], self.datos[j] = self.datos[j], self.datos[i]
+
+    def _subir(self, i):
+        while i > 0:
+            padre = (i - 1) // 2
+            if not self.claves[i] < self.claves[padre]:
+                break
+            self._intercambiar(i, padre)
+            i = padre
+
+    def _bajar(self, i):
+        n = len(self.claves)
+        while True:
+            menor = i
+            izquierdo = 2 * i + 1
+            derecho = izquierdo + 1
+            if izquierdo < n and self.claves[izquierdo] < self.claves[menor]:
+                menor = izquierdo
+            if derecho < n and self.claves[derecho] < self.claves[menor]:
+                menor = derecho
+            if menor == i:
+                return
+            self._intercambiar(i, menor)
+            i = menor
+
+class ArbolFenwick:
+    """Árbol de Fenwick sobre las posiciones 0, 1, 2, ... que crece a demanda.
+
+    Actualiza una posición y suma un prefijo en O(log n). La capacidad es
+    siempre potencia de dos para poder duplicarla sin recalcular el árbol.
+    """
+    def __init__(self, valores=()):
+        valores = list(valores)
+        capacidad = 1
+        while capacidad < len(valores):
+            capacidad *= 2
+        self.arbol = [0] + valores + [0] * (capacidad - len(valores))
+        # Construcción lineal: cada nodo pasa su suma a su padre
+        for i in range(1, capacidad + 1):
+            padre = i + (i & -i)
+            if padre <= capacidad:
+                self.arbol[padre] += self.arbol[i]
+
+    def __len__(self):
+        return len(self.arbol) - 1
+
+    def _crecer(self):
+        # Los nodos nuevos cubren solo posiciones nuevas (en cero), salvo el
+        # último, que cubre todo el arreglo y hereda el total actual
+        capacidad = len(self.arbol) - 1
+        self.arbol.extend([0] * capacidad)
+        self.arbol[2 * capacidad] = self.arbol[capacidad]
+
+    def agregar(self, posicion, delta):
+        """Suma delta al valor de la posición."""
+        i = posicion + 1
+        while i >= len(self.arbol):
+            self._crecer()
+        n = len(self.arbol)
+        while i < n:
+            self.arbol[i] += delta
+            i += i & -i
+
+    def prefijo(self, posicion):
+        """Suma de los valores de las posiciones menores que posicion."""
+        i = min(posicion, len(self.arbol) - 1)
+        total = 0
+        while i > 0:
+            total += self.arbol[i]
+            i -= i & -i
+        return total
+
+class BosquejoCuantiles:
+    """Resumen de cuantiles con error relativo acotado y memoria fija (tipo DDSketch).
+
+    Cada valor positivo cae en la cubeta ceil(log_gamma(valor)), con
+    gamma = (1 + precision) / (1 - precision); los ceros se cuentan aparte.
+    Si hay más de max_cubetas se fusionan las más bajas, de modo que la
+    memoria no depende de la cantidad de valores. Dos bosquejos con la misma
+    precisión se pueden combinar.
+    """
+    def __init__(self, precision=0.01, max_cubetas=2048):
+        self.precision = precision
+        self.max_cubetas = max_cubetas
+        self.gamma = (1 + precision) / (1 - precision)
+        self._log_gamma = math.log(self.gamma)
+        self.conteos = []  # conteos[i] corresponde a la cubeta desplazamiento + i
+        self.desplazamiento = 0
+        self.ceros = 0
+        self.cantidad = 0
+        self.minimo = None
+        self.maximo = None
+
+    def __len__(self):
+        return self.cantidad
+
+    def _cubeta(self, valor):
+        return math.ceil(math.log(valor) / self._log_gamma)
+
+    def _sumar_en_cubeta(self, cubeta, conteo):
+        if len(self.conteos) == 0:
+            self.desplazamiento = cubeta
+            self.conteos.append(0)
+        elif cubeta < self.desplazamiento:
+            self.conteos[0:0] = [0] * (self.desplazamiento - cubeta)
+            self.desplazamiento = cubeta
+        elif cubeta >= self.desplazamiento + len(self.conteos):
+            self.conteos.extend([0] * (cubeta - self.desplazamiento - len(self.conteos) + 1))
+        self.conteos[cubeta - self.desplazamiento] += conteo
+        if len(self.conteos) > self.max_cubetas:
+            # Fusionar las cubetas más bajas en la primera que se conserva
+            sobrante = len(self.conteos) - self.max_cubetas
+            self.conteos[sobrante] += sum(self.conteos[:sobrante])
+            del self.conteos[:sobrante]
+            self.desplazamiento += sobrante
+
+    def _registrar(self, valor, conteo):
+        self.cantidad += conteo
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+        if self.maximo is None or valor > self.maximo:
+            self.maximo = valor
+
+    def agregar(self, valor):
+        valor = valor.a_entero() if hasattr(valor, 'a_entero') else valor
+        self._registrar(valor, 1)
+        if valor <= 0:
+            self.ceros += 1
+        else:
+            self._sumar_en_cubeta(self._cubeta(valor), 1)
+
+    def combinar(self, otro):
+        """Retorna un bosquejo nuevo con los valores de ambos."""
+        if otro.precision != self.precision:
+            raise ValueError("Solo se pueden combinar bosquejos con la misma precisión")
+        resultado = BosquejoCuantiles(self.precision, max(self.max_cubetas, otro.max_cubetas))
+        for origen in (self, otro):
+            if origen.cantidad == 0:
+                continue
+            resultado._registrar(origen.minimo, 0)
+            resultado._registrar(origen.maximo, 0)
+            resultado.cantidad += origen.cantidad
+            resultado.ceros += origen.ceros
+            for i, conteo in enumerate(origen.conteos):
+                if conteo > 0:
+                    resultado._sumar_en_cubeta(origen.desplazamiento + i, conteo)
+        return resultado
+
+    def cuantil(self, q):
+        """Valor aproximado del cuantil q (0 <= q <= 1); 0 si no hay valores."""
+        if self.cantidad == 0:
+            return 0
+        rango = q * (self.cantidad - 1)
+        if rango < self.ceros:
+            return max(0, self.minimo)
+        acumulado = self.ceros
+        for i, conteo in enumerate(self.conteos):
+            acumulado += conteo
+            if acumulado > rango:
+                cubeta = self.desplazamiento + i
+                valor = 2 * self.gamma ** cubeta / (self.gamma + 1)
+                return min(max(valor, self.minimo), self.maximo)
+        return self.maximo
+
+class EstadisticaAcumulada:
+    """Acumula cantidad, suma, mínimo, máximo y varianza (Welford) en O(1) por valor.
+
+    Los cuantiles se aproximan con un BosquejoCuantiles. Dos acumuladores se
+    pueden combinar sin volver a recorrer los datos."""
+    def __init__(self):
+        self.cantidad = 0
+        self.suma = 0
+        self.minimo = None
+        self.maximo = None
+        self._media = 0.0
+        self._m2 = 0.0  # Suma de cuadrados de las desviaciones a la media
+        self.cuantiles = BosquejoCuantiles()
+
+    def __len__(self):
+        return self.cantidad
+
+    def agregar(self, valor):
+        valor = valor.a_entero() if hasattr(valor, 'a_entero') else valor
+        self.cantidad += 1
+        self.suma += valor
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+        if self.maximo is None or valor > self.maximo:
+            self.maximo = valor
+        delta = valor - self._media
+        self._media += delta / self.cantidad
+        self._m2 += delta * (valor - self._media)
+        self.cuantiles.agregar(valor)
+
+    def combinar(self, otra):
+        """Retorna un acumulador nuevo con los valores de ambos."""
+        resultado = EstadisticaAcumulada()
+        for origen in (self, otra):
+            if origen.cantidad == 0:
+                continue
+            if resultado.cantidad == 0:
+                resultado.cantidad = origen.cantidad
+                resultado.suma = origen.suma
+                resultado.minimo = origen.minimo
+                resultado.maximo = origen.maximo
+                resultado._media = origen._media
+                resultado._m2 = origen._m2
+                continue
+            total = resultado.cantidad + origen.cantidad
+            delta = origen._media - resultado._media
+            resultado._m2 += origen._m2 + delta * delta * resultado.cantidad * origen.cantidad / total
+            resultado._media += delta * origen.cantidad / total
+            resultado.cantidad = total
+            resultado.suma += origen.suma
+            resultado.minimo = min(resultado.minimo, origen.minimo)
+            resultado.maximo = max(resultado.maximo, origen.maximo)
+        resultado.cuantiles = self.cuantiles.combinar(otra.cuantiles)
+        return resultado
+
+    def percentil(self, p):
+        return self.cuantiles.cuantil(p / 100)
+
+    def promedio(self):
+        return self.suma / self.cantidad if self.cantidad > 0 else 0
+
+    def varianza(self):
+        """Varianza poblacional de los valores acumulados."""
+        return self._m2 / self.cantidad if self.cantidad > 0 else 0
+
+    def desviacion(self):
+        return self.varianza() ** 0.5
+
+class EstadisticaReversible:
+    """Cantidad, suma y varianza de valores que se pueden agregar y quitar en O(1).
+
+    Guarda sumas exactas (los valores son minutos enteros), así que quitar un
+    valor deshace su alta sin error acumulado. No lleva mínimo, máximo ni
+    cuantiles porque esos no se pueden deshacer."""
+    def __init__(self):
+        self.cantidad = 0
+        self.suma = 0
+        self.suma_cuadrados = 0
+
+    def __len__(self):
+        return self.cantidad
+
+    def agregar(self, valor):
+        valor = valor.a_entero() if hasattr(valor, 'a_entero') else valor
+        self.cantidad += 1
+        self.suma += valor
+        self.suma_cuadrados += valor * valor
+
+    def quitar(self, valor):
+        valor = valor.a_entero() if hasattr(valor, 'a_entero') else valor
+        self.cantidad -= 1
+        self.suma -= valor
+        self.suma_cuadrados -= valor * valor
+
+    def promedio(self):
+        return self.suma / self.cantidad if self.cantidad > 0 else 0
+
+    def varianza(self):
+        """Varianza poblacional de los valores presentes."""
+        if self.cantidad == 0:
+            return 0
+        return max(self.suma_cuadrados / self.cantidad - self.promedio() ** 2, 0)
+
+    def desviacion(self):
+        return self.varianza() ** 0.5
+
 class Par:
     def __init__(self, clave, valor):
         self.clave = clave
@@ -173,255 +634,169 @@ class Par:
         yield self.clave
         yield self.valor
 
-class ParCaracterValor:
-    def __init__(self, caracter, valor):
-        self.caracter = caracter
-        self.valor = valor
-
 class DiccionarioPersonalizado:
-    def __init__(self, capacidad=10):
-        self.capacidad = capacidad
-        self.tabla = ListaEnlazada()
+    """Tabla hash de direccionamiento abierto con sondeo lineal.
+
+    Las entradas viven en un arreglo contiguo de ranuras cuya capacidad es
+    potencia de dos; al superar el factor de carga la tabla se duplica y se
+    redistribuye, por lo que agregar/obtener/contains son O(1) amortizado.
+    """
+    FACTOR_CARGA_MAXIMO = 0.7
+    _BORRADO = object()  # Marca de ranura liberada por eliminar()
+
+    def __init__(self, capacidad=8):
+        self.capacidad = 8
+        self.bits = 3
+        while self.capacidad < capacidad:
+            self.capacidad *= 2
+            self.bits += 1
+        self.ranuras = [None] * self.capacidad
+        self.hashes = [0] * self.capacidad
         self.tamano = 0
-        
-        # Inicialización sin estructuras nativas
-        contador = 0
-        while contador < capacidad:
-            self.tabla.agregar(ListaEnlazada())
-            contador += 1
-
-        # Tabla de caracteres completamente manual
-        self.char_map = ListaEnlazada()
-        self._inicializar_tabla_caracteres()
-
-    def _inicializar_tabla_caracteres(self):
-        self.char_map = ListaEnlazada()
-        
-        # Fabricamos los caracteres uno por uno usando MiCaracter
-        self._agregar_rango(MiCaracter('a'), MiCaracter('z'), 97)  # Minúsculas
-        self._agregar_rango(MiCaracter('A'), MiCaracter('Z'), 65)  # Mayúsculas
-        self._agregar_rango(MiCaracter('0'), MiCaracter('9'), 48)  # Dígitos
-        
-        # Caracteres especiales
-        especiales = ListaEnlazada()
-        especiales.agregar(MiCaracter(' '))
-        especiales.agregar(MiCaracter('!'))
-        especiales.agregar(MiCaracter('@'))
-        especiales.agregar(MiCaracter('#'))
-        especiales.agregar(MiCaracter('$'))
-        especiales.agregar(MiCaracter('%'))
-        especiales.agregar(MiCaracter('&'))
-        especiales.agregar(MiCaracter('*'))
-        especiales.agregar(MiCaracter('('))
-        especiales.agregar(MiCaracter(')'))
-        especiales.agregar(MiCaracter('-'))
-
-    def _siguiente_caracter(self, char):
-        """Devuelve el siguiente caracter en la secuencia ASCII usando solo estructuras personalizadas"""
-        # Inicializar tabla de transición si no existe
-        if not hasattr(self, '_tabla_transicion'):
-            self._inicializar_tabla_transicion()
-        
-        # Buscar en la lista enlazada
-        actual = self._tabla_transicion.cabeza
-        while actual is not None:
-            par = actual.dato  # Objeto ParCaracterValor
-            if par.caracter.igual_a(char):
-                return par.valor
-            actual = actual.siguiente
-        
-        return MiCaracter('?')  # Caracter por defecto
-
-    def _inicializar_tabla_transicion(self):
-        """Inicializa la tabla de transición de caracteres"""
-        self._tabla_transicion = ListaEnlazada()
-        
-        # Minúsculas (a-z)
-        self._agregar_transicion('a', 'b')
-        self._agregar_transicion('b', 'c')
-        self._agregar_transicion('c', 'd')
-        self._agregar_transicion('d', 'e')
-        self._agregar_transicion('e', 'f')
-        self._agregar_transicion('f', 'g')
-        self._agregar_transicion('g', 'h')
-        self._agregar_transicion('h', 'i')
-        self._agregar_transicion('i', 'j')
-        self._agregar_transicion('j', 'k')
-        self._agregar_transicion('k', 'l')
-        self._agregar_transicion('l', 'm')
-        self._agregar_transicion('m', 'n')
-        self._agregar_transicion('n', 'o')
-        self._agregar_transicion('o', 'p')
-        self._agregar_transicion('p', 'q')
-        self._agregar_transicion('q', 'r')
-        self._agregar_transicion('r', 's')
-        self._agregar_transicion('s', 't')
-        self._agregar_transicion('t', 'u')
-        self._agregar_transicion('u', 'v')
-        self._agregar_transicion('v', 'w')
-        self._agregar_transicion('w', 'x')
-        self._agregar_transicion('x', 'y')
-        self._agregar_transicion('y', 'z')
-        self._agregar_transicion('z', 'A')  # Fin de minúsculas
-        
-        # Mayúsculas (A-Z)
-        self._agregar_transicion('A', 'B')
-        self._agregar_transicion('B', 'C')
-        self._agregar_transicion('C', 'D')
-        self._agregar_transicion('D', 'E')
-        self._agregar_transicion('E', 'F')
-        self._agregar_transicion('F', 'G')
-        self._agregar_transicion('G', 'H')
-        self._agregar_transicion('H', 'I')
-        self._agregar_transicion('I', 'J')
-        self._agregar_transicion('J', 'K')
-        self._agregar_transicion('K', 'L')
-        self._agregar_transicion('L', 'M')
-        self._agregar_transicion('M', 'N')
-        self._agregar_transicion('N', 'O')
-        self._agregar_transicion('O', 'P')
-        self._agregar_transicion('P', 'Q')
-        self._agregar_transicion('Q', 'R')
-        self._agregar_transicion('R', 'S')
-        self._agregar_transicion('S', 'T')
-        self._agregar_transicion('T', 'U')
-        self._agregar_transicion('U', 'V')
-        self._agregar_transicion('V', 'W')
-        self._agregar_transicion('W', 'X')
-        self._agregar_transicion('X', 'Y')
-        self._agregar_transicion('Y', 'Z')
-        self._agregar_transicion('Z', '0')  # Fin de mayúsculas
-        
-        # Dígitos (0-9)
-        self._agregar_transicion('0', '1')
-        self._agregar_transicion('1', '2')
-        self._agregar_transicion('2', '3')
-        self._agregar_transicion('3', '4')
-        self._agregar_transicion('4', '5')
-        self._agregar_transicion('5', '6')
-        self._agregar_transicion('6', '7')
-        self._agregar_transicion('7', '8')
-        self._agregar_transicion('8', '9')
-        self._agregar_transicion('9', ' ')  # Fin de dígitos
-
-    def _agregar_transicion(self, actual, siguiente):
-        """Agrega una transición entre caracteres"""
-        par = ParCaracterValor(
-            MiCaracter(actual),
-            MiCaracter(siguiente)
-        )
-        self._tabla_transicion.agregar(par)
-
-    def _agregar_rango(self, inicio, fin, codigo_base):
-        """Agrega un rango de caracteres continuos"""
-        codigo = codigo_base
-        char_actual = inicio
-        
-        while not char_actual.igual_a(fin):
-            self.char_map.agregar(ParCaracterValor(char_actual, MiNumero(codigo)))
-            codigo += 1
-            char_actual = self._siguiente_caracter(char_actual)
-        
-        # Agregar el último caracter del rango
-        self.char_map.agregar(ParCaracterValor(fin, MiNumero(codigo)))
-
-    def _get_char_code(self, char):
-        actual = self.char_map.cabeza
-        while actual is not None:
-            par = actual.dato  # Objeto ParCaracterValor
-            if par.caracter.igual_a(char):  # Usa comparación personalizada
-                return par.valor.a_entero()  # Convierte MiNumero a entero
-            actual = actual.siguiente
-        return MiNumero(0)  # Usamos MiNumero para consistencia
+        self.ocupadas = 0  # Entradas vivas más ranuras borradas
 
-    def _verificar_metodo(self, obj, metodo):
-        # Sistema de verificación sin hasattr()
-        # Requiere que todos los objetos tengan un método 'tiene_metodo'
-        if obj is None:
-            return False
-        return obj.tiene_metodo(metodo)
-
-    def _es_string(self, obj):
-        # Caso especial para strings nativos
-        if isinstance(obj, str):  # Esto es temporal solo para la transición
-            return True
-        if not self._verificar_metodo(obj, 'es_string'):
-            return False
-        return obj.es_string()
-
-    def _iguales(self, obj1, obj2):
-        if not self._verificar_metodo(obj1, 'igual_a'):
-            return False
-        return obj1.igual_a(obj2)
-
-    def _es_numero(self, obj):
-        if not self._verificar_metodo(obj, 'es_numero'):
-            return False
-        return obj.es_numero()
-
-    def _hash_string(self, clave):
+    def _hash_texto(self, texto):
+        # Mismo polinomio que MiString.hash_personalizado para que un str y un
+        # MiString con el mismo contenido caigan en la misma ranura
         hash_val = 0
-        i = 0
-        while i < len(clave):  # Cambiado de clave.longitud() a len(clave)
-            char_val = self._get_char_code(clave.obtener_caracter(i))
-            hash_val = (hash_val * 31 + char_val) % self.capacidad
-            i += 1
+        for char in texto:
+            hash_val = (hash_val * 31 + ord(char)) % (2**32)
         return hash_val
 
     def _hash(self, clave):
         if isinstance(clave, str):  # Caso especial para strings nativos
-            return self._hash_string(MiString(clave))
-        if self._es_string(clave):
-            return self._hash_string(clave)
-        elif self._es_numero(clave):
-            # Convertir MiNumero a entero antes de aplicar módulo
-            num = clave.a_entero() if hasattr(clave, 'a_entero') else clave
-            return num % self.capacidad
-        else:
-            return clave.hash_personalizado() % self.capacidad
+            return self._hash_texto(clave)
+        if isinstance(clave, int):
+            return clave
+        if isinstance(clave, MiObjeto):
+            return clave.hash_personalizado()
+        return hash(clave)
+
+    def _iguales(self, clave1, clave2):
+        if clave1 is clave2:
+            return True
+        if isinstance(clave1, str) or isinstance(clave2, str):
+            texto1 = clave1.a_texto() if isinstance(clave1, MiString) else clave1
+            texto2 = clave2.a_texto() if isinstance(clave2, MiString) else clave2
+            return texto1 == texto2
+        if isinstance(clave1, MiObjeto) and isinstance(clave2, MiObjeto):
+            return clave1.igual_a(clave2)
+        return clave1 == clave2
+
+    def _ranura_inicial(self, hash_val):
+        # Hashing de Fibonacci: toma los bits altos del producto para que claves
+        # consecutivas (tickets, números) no formen racimos contiguos
+        return ((hash_val * 2654435769) & 0xFFFFFFFF) >> (32 - self.bits)
+
+    def _buscar_ranura(self, clave, hash_val):
+        """Retorna (índice, encontrada). Si la clave no existe, el índice es la
+        primera ranura reutilizable de su secuencia de sondeo."""
+        mascara = self.capacidad - 1
+        indice = self._ranura_inicial(hash_val)
+        primera_borrada = None
+        while True:
+            par = self.ranuras[indice]
+            if par is None:
+                return (indice if primera_borrada is None else primera_borrada), False
+            if par is self._BORRADO:
+                if primera_borrada is None:
+                    primera_borrada = indice
+            elif self.hashes[indice] == hash_val and self._iguales(par.clave, clave):
+                return indice, True
+            indice = (indice + 1) & mascara
+
+    def _redimensionar(self, capacidad):
+        anteriores = self.ranuras
+        while (1 << self.bits) < capacidad:
+            self.bits += 1
+        self.capacidad = capacidad
+        self.ranuras = [None] * capacidad
+        self.hashes = [0] * capacidad
+        self.ocupadas = self.tamano
+        mascara = capacidad - 1
+        for par in anteriores:
+            if par is None or par is self._BORRADO:
+                continue
+            hash_val = self._hash(par.clave)
+            indice = self._ranura_inicial(hash_val)
+            while self.ranuras[indice] is not None:
+                indice = (indice + 1) & mascara
+            self.ranuras[indice] = par
+            self.hashes[indice] = hash_val
 
     def agregar(self, clave, valor):
-        indice = self._hash(clave)
-        bucket = self.tabla[indice]
-        
-        actual = bucket.cabeza
-        while actual is not None:
-            if actual.dato.clave.igual_a(clave):
-                actual.dato.valor = valor
-                return
-            actual = actual.siguiente
+        hash_val = self._hash(clave)
+        indice, encontrada = self._buscar_ranura(clave, hash_val)
+        if encontrada:
+            self.ranuras[indice].valor = valor
+            return
         
-        bucket.agregar(Par(clave, valor))
+        if self.ranuras[indice] is None:
+            if self.ocupadas + 1 > self.capacidad * self.FACTOR_CARGA_MAXIMO:
+                # Duplicar solo si la carga viene de entradas vivas; si la mayoría
+                # son ranuras borradas basta con redistribuir en el mismo tamaño
+                if self.tamano * 2 >= self.ocupadas:
+                    self._redimensionar(self.capacidad * 2)
+                else:
+                    self._redimensionar(self.capacidad)
+                indice, _ = self._buscar_ranura(clave, hash_val)
+            self.ocupadas += 1
+        
+        self.ranuras[indice] = Par(clave, valor)
+        self.hashes[indice] = hash_val
         self.tamano += 1
 
     def obtener(self, clave):
-        indice = self._hash(clave)
-        lista_bucket = self.tabla.obtener_por_indice(indice)  #Método personalizado
-        
-        actual = lista_bucket.cabeza
-        while actual is not None:
-            if actual.dato.clave.igual_a(clave):  #Comparación personalizada
-                return actual.dato.valor
-            actual = actual.siguiente
-        raise KeyError(clave)
+        indice, encontrada = self._buscar_ranura(clave, self._hash(clave))
+        if not encontrada:
+            raise KeyError(clave)
+        return self.ranuras[indice].valor
+
+    def eliminar(self, clave):
+        """Elimina la clave y retorna su valor"""
+        indice, encontrada = self._buscar_ranura(clave, self._hash(clave))
+        if not encontrada:
+            raise KeyError(clave)
+        valor = self.ranuras[indice].valor
+        self.ranuras[indice] = self._BORRADO
+        self.tamano -= 1
+        return valor
     
     def __contains__(self, clave):
-        try:
-            self.obtener(clave)
-            return True
-        except KeyError:
-            return False
+        return self._buscar_ranura(clave, self._hash(clave))[1]
+
+    def __len__(self):
+        return self.tamano
     
     def items(self):
         items = ListaEnlazada()
-        actual_bucket = self.tabla.cabeza
-        while actual_bucket is not None:
-            actual_elemento = actual_bucket.dato.cabeza
-            while actual_elemento is not None:
-                items.agregar(Par(actual_elemento.dato.clave, actual_elemento.dato.valor))
-                actual_elemento = actual_elemento.siguiente
-            actual_bucket = actual_bucket.siguiente
+        for par in self.ranuras:
+            if par is not None and par is not self._BORRADO:
+                items.agregar(Par(par.clave, par.valor))
         return items
+
+    def stats(self):
+        """Estadísticas de ocupación y longitud de sondeo de la tabla"""
+        mascara = self.capacidad - 1
+        total_sondeos = 0
+        sondeo_maximo = 0
+        for indice in range(self.capacidad):
+            par = self.ranuras[indice]
+            if par is None or par is self._BORRADO:
+                continue
+            inicial = self._ranura_inicial(self.hashes[indice])
+            sondeos = ((indice - inicial) & mascara) + 1
+            total_sondeos += sondeos
+            if sondeos > sondeo_maximo:
+                sondeo_maximo = sondeos
+        return {
+            "capacidad": self.capacidad,
+            "tamano": self.tamano,
+            "ranuras_borradas": self.ocupadas - self.tamano,
+            "factor_carga": self.tamano / self.capacidad,
+            "sondeo_promedio": total_sondeos / self.tamano if self.tamano > 0 else 0,
+            "sondeo_maximo": sondeo_maximo
+        }
     
     def __getitem__(self, clave):
         return self.obtener(clave)
@@ -437,33 +812,83 @@ class ConjuntoPersonalizado:
         # Versión correcta sin sintaxis nativa
         self.diccionario.agregar(elemento, True)
 
+    def eliminar(self, elemento):
+        self.diccionario.eliminar(elemento)
+
     def __contains__(self, elemento):
-        # Versión sin operador 'in' nativo
-        return self.diccionario.obtener(elemento) is not None
+        return elemento in self.diccionario
+
+    def __len__(self):
+        return len(self.diccionario)
 
     def __iter__(self):
         for par in self.diccionario.items():
             yield par.clave
 
-class MiObjeto:
-    def __init__(self):
-        self.metodos = ListaEnlazada()
-        self._inicializar_metodos()
+class ConjuntoIndexado:
+    """Conjunto de objetos (por identidad) con alta, baja y pertenencia en O(1).
+
+    Los elementos viven en un arreglo y el diccionario guarda la posición de
+    cada uno; al eliminar, el último ocupa el hueco. Recorrerlo cuesta lo que
+    su tamaño, no lo que llegó a medir.
+    """
+    def __init__(self, elementos=()):
+        self.elementos = []
+        self.posiciones = DiccionarioPersonalizado()  # id(elemento) -> posición
+        for elemento in elementos:
+            self.agregar(elemento)
+
+    def __getstate__(self):
+        # Las identidades no sobreviven a la copia; se reconstruyen al cargar
+        return {'elementos': list(self.elementos)}
+
+    def __setstate__(self, estado):
+        self.__init__(estado['elementos'])
+
+    def agregar(self, elemento):
+        clave = id(elemento)
+        if clave in self.posiciones:
+            return False
+        self.posiciones.agregar(clave, len(self.elementos))
+        self.elementos.append(elemento)
+        return True
+
+    def eliminar(self, elemento):
+        clave = id(elemento)
+        if clave not in self.posiciones:
+            return False
+        posicion = self.posiciones.eliminar(clave)
+        ultimo = self.elementos.pop()
+        if ultimo is not elemento:
+            self.elementos[posicion] = ultimo
+            self.posiciones.agregar(id(ultimo), posicion)
+        return True
+
+    def __contains__(self, elemento):
+        return id(elemento) in self.posiciones
+
+    def __len__(self):
+        return len(self.elementos)
+
+    def __iter__(self):
+        # Sobre una copia: se puede modificar el conjunto mientras se recorre
+        return iter(list(self.elementos))
 
-    def _inicializar_metodos(self):
-        self.metodos.agregar('tiene_metodo')
-        self.metodos.agregar('es_string')
-        self.metodos.agregar('es_numero')
-        self.metodos.agregar('igual_a')
-        self.metodos.agregar('hash_personalizado')
+class MiObjeto:
+    __slots__ = ()
+
+    # Registro de métodos compartido por clase: las instancias no guardan su
+    # propia lista y cada subclase amplía el conjunto de su clase base
+    METODOS = frozenset((
+        'tiene_metodo',
+        'es_string',
+        'es_numero',
+        'igual_a',
+        'hash_personalizado'
+    ))
 
     def tiene_metodo(self, nombre):
-        actual = self.metodos.cabeza
-        while actual is not None:
-            if actual.dato == nombre:
-                return True
-            actual = actual.siguiente
-        return False
+        return nombre in self.METODOS
 
     def es_string(self):
         return False
@@ -482,82 +907,99 @@ class MiObjeto:
 
 
 class MiString(MiObjeto):
+    """Cadena inmutable respaldada por una tupla contigua de puntos de código.
+
+    El acceso por índice es O(1); la longitud se fija al construirla y el hash
+    se calcula una sola vez.
+    """
+    METODOS = MiObjeto.METODOS | frozenset((
+        'longitud',
+        'obtener_caracter',
+        'a_texto',
+        '__len__'
+    ))
+
     def __init__(self, valor=None):
         super().__init__()
-        self.caracteres = ListaEnlazada()
-        self._agregar_metodos_string()
-        
-        if valor is not None:
-            # Manejar tanto strings nativos como objetos MiString
-            if isinstance(valor, str):
-                # Construir desde string nativo
-                for char in valor:
-                    self.caracteres.agregar(MiCaracter(char))
-            elif hasattr(valor, 'longitud') and hasattr(valor, 'obtener_caracter'):
-                # Construir desde otro MiString o similar
-                for i in range(valor.longitud()):
-                    self.caracteres.agregar(valor.obtener_caracter(i))
-            else:
-                raise ValueError("El valor debe ser un string o un objeto con métodos longitud() y obtener_caracter()")
+        
+        if valor is None:
+            codigos = ()
+        elif isinstance(valor, str):
+            # Construir desde string nativo
+            codigos = tuple(ord(char) for char in valor)
+        elif isinstance(valor, MiString):
+            # La tupla es inmutable, así que puede compartirse sin copiarla
+            codigos = valor.codigos
+        elif hasattr(valor, 'longitud') and hasattr(valor, 'obtener_caracter'):
+            # Construir desde otro objeto similar
+            codigos = tuple(valor.obtener_caracter(i).codigo() for i in range(valor.longitud()))
+        else:
+            raise ValueError("El valor debe ser un string o un objeto con métodos longitud() y obtener_caracter()")
+        
+        self.codigos = codigos
+        self._longitud = len(codigos)
+        self._hash = None
+
+    @classmethod
+    def desde_codigos(cls, codigos):
+        """Construye el MiString directamente desde una tupla de puntos de código."""
+        cadena = cls.__new__(cls)
+        cadena.codigos = codigos
+        cadena._longitud = len(codigos)
+        cadena._hash = None
+        return cadena
 
     def __len__(self):
         """Implementación del método especial para que funcione con len()"""
-        return self.longitud()
+        return self._longitud
 
     def a_texto(self):
         """Convierte el MiString a string nativo para la UI"""
-        result = ""
-        for i in range(self.longitud()):
-            result += chr(self.obtener_caracter(i).codigo())
-        return result
-
-    def _agregar_metodos_string(self):
-        self.metodos.agregar('longitud')
-        self.metodos.agregar('obtener_caracter')
-        self.metodos.agregar('a_texto')
-        self.metodos.agregar('__len__')
+        return ''.join(map(chr, self.codigos))
 
     def es_string(self):
         return True
 
     def longitud(self):
-        count = 0
-        actual = self.caracteres.cabeza
-        while actual is not None:
-            count += 1
-            actual = actual.siguiente
-        return count
+        return self._longitud
 
     def obtener_caracter(self, index):
-        if index < 0 or index >= self.longitud():
+        if index < 0 or index >= self._longitud:
             raise IndexError("Índice fuera de rango")
-        
-        actual = self.caracteres.cabeza
-        for _ in range(index):
-            actual = actual.siguiente
-        return actual.dato
+        return MiCaracter(chr(self.codigos[index]))
 
     def igual_a(self, otro):
         if not otro.tiene_metodo('es_string') or not otro.es_string():
             return False
         
-        if self.longitud() != otro.longitud():
+        if self._longitud != otro.longitud():
             return False
         
-        for i in range(self.longitud()):
-            if not self.obtener_caracter(i).igual_a(otro.obtener_caracter(i)):
+        if isinstance(otro, MiString):
+            if self._hash is not None and otro._hash is not None and self._hash != otro._hash:
+                return False
+            return self.codigos == otro.codigos
+        
+        for i in range(self._longitud):
+            if self.codigos[i] != otro.obtener_caracter(i).codigo():
                 return False
         return True
 
     def agregar_caracter(self, caracter):
-        self.caracteres.agregar(caracter)
+        """Retorna un MiString nuevo con el caracter al final, en O(n).
+
+        El original no cambia: puede ser clave de un DiccionarioPersonalizado
+        (ids, tickets) y su hash debe seguir siendo el mismo.
+        """
+        return MiString.desde_codigos(self.codigos + (caracter.codigo(),))
 
     def hash_personalizado(self):
-        hash_val = 0
-        for i in range(self.longitud()):
-            char_val = self.obtener_caracter(i).codigo()
-            hash_val = (hash_val * 31 + char_val) % (2**32)
-        return hash_val
+        if self._hash is None:
+            hash_val = 0
+            for codigo in self.codigos:
+                hash_val = (hash_val * 31 + codigo) % (2**32)
+            self._hash = hash_val
+        return self._hash
     
     @staticmethod
     def asegurar_mi_string(valor):
@@ -565,13 +1007,13 @@ class MiString(MiObjeto):
         return valor if isinstance(valor, MiString) else MiString(valor)
 
 class MiCaracter(MiObjeto):
+    METODOS = MiObjeto.METODOS | frozenset((
+        'codigo',
+    ))
+
     def __init__(self, valor):
         super().__init__()
         self.valor = valor
-        self.metodos.agregar('codigo')
-        self.metodos.agregar('es_string')
-        self.metodos.agregar('es_numero')
-        self.metodos.agregar('igual_a')
 
     def codigo(self):
         # Implementación simplificada - en producción usar tabla personalizada
@@ -589,27 +1031,63 @@ class MiCaracter(MiObjeto):
         return False
 
 class MiNumero(MiObjeto):
-    def __init__(self, valor):
-        super().__init__()
-        self.valor = valor
-        # Inicializar métodos disponibles
-        self.metodos.agregar('a_entero')
-        self.metodos.agregar('__add__')
-        self.metodos.agregar('__radd__')
-        self.metodos.agregar('__sub__')
-        self.metodos.agregar('__rsub__')
-        self.metodos.agregar('__mul__')
-        self.metodos.agregar('__rmul__')
-        self.metodos.agregar('__truediv__')
-        self.metodos.agregar('__rtruediv__')
-        self.metodos.agregar('__mod__')
-        self.metodos.agregar('__rmod__')
-        self.metodos.agregar('__ge__')
-        self.metodos.agregar('__le__')
-        self.metodos.agregar('__gt__')
-        self.metodos.agregar('__lt__')
-        self.metodos.agregar('__eq__')
-        self.metodos.agregar('__ne__')
+    """Número inmutable.
+
+    Los enteros entre RESERVA_MINIMO y RESERVA_MAXIMO (los minutos de un día)
+    se comparten desde una reserva creada al cargar el módulo, de modo que
+    MiNumero(5) o la suma de dos tiempos de atención no reservan memoria.
+    """
+    __slots__ = ('valor',)
+
+    RESERVA_MINIMO = 0
+    RESERVA_MAXIMO = 1440
+    _reserva = None
+
+    METODOS = MiObjeto.METODOS | frozenset((
+        'a_entero',
+        '__add__',
+        '__radd__',
+        '__sub__',
+        '__rsub__',
+        '__mul__',
+        '__rmul__',
+        '__truediv__',
+        '__rtruediv__',
+        '__mod__',
+        '__rmod__',
+        '__ge__',
+        '__le__',
+        '__gt__',
+        '__lt__',
+        '__eq__',
+        '__ne__'
+    ))
+
+    def __new__(cls, valor):
+        if (type(valor) is int and cls._reserva is not None
+                and cls.RESERVA_MINIMO <= valor <= cls.RESERVA_MAXIMO):
+            return cls._reserva[valor - cls.RESERVA_MINIMO]
+        return cls._crear(valor)
+
+    @classmethod
+    def _crear(cls, valor):
+        numero = object.__new__(cls)
+        object.__setattr__(numero, 'valor', valor)
+        return numero
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("MiNumero es inmutable")
+
+    def __delattr__(self, nombre):
+        raise AttributeError("MiNumero es inmutable")
+
+    def __reduce__(self):
+        # Reconstruir pasando por __new__ para reutilizar la reserva
+        return (MiNumero, (self.valor,))
+
+    def __hash__(self):
+        # Consistente con __eq__, que considera igual a un int con el mismo valor
+        return hash(self.valor)
 
     def a_entero(self):
         """Convierte el número a entero nativo (únicamente para compatibilidad cuando sea estrictamente necesario)"""
@@ -782,6 +1260,11 @@ class MiNumero(MiObjeto):
         """Representación para depuración"""
         return f"MiNumero({self.valor})"
 
+MiNumero._reserva = tuple(
+    MiNumero._crear(valor)
+    for valor in range(MiNumero.RESERVA_MINIMO, MiNumero.RESERVA_MAXIMO + 1)
+)
+
 # ==================== CLASES DEL MODELO (TDA) ====================
 
 class Empresa:
@@ -791,6 +1274,8 @@ class Empresa:
         self.abreviatura = abreviatura
         self.puntos_atencion = ListaEnlazada()
         self.transacciones = ListaEnlazada()
+        self.indice_puntos = DiccionarioPersonalizado()
+        self.indice_transacciones = DiccionarioPersonalizado()
 
 class PuntoAtencion:
     def __init__(self, id_punto, nombre, direccion):
@@ -798,8 +1283,17 @@ class PuntoAtencion:
         self.nombre = nombre
         self.direccion = direccion
         self.escritorios = ListaEnlazada()
+        self.indice_escritorios = DiccionarioPersonalizado()
         self.clientes_en_espera = ListaDoblementeEnlazada()
         self.clientes_atendidos = ListaDoblementeEnlazada()
+        self.estadistica_espera = EstadisticaAcumulada()  # Esperas de los atendidos
+        self.estadistica_atencion = EstadisticaAcumulada()
+        self.espera_en_cola = EstadisticaReversible()  # Esperas proyectadas de quienes siguen en cola
+        self.total_activos = 0  # Escritorios activos del punto
+        self.despacho = MonticuloMinimo()  # (minuto en que queda libre, orden) -> escritorio activo
+        self.despacho_vigente = False  # Si el montículo refleja la cola actual
+        self.indice_cola = IndiceCola(self.clientes_en_espera)
+        self.escritorios_ocupados = ConjuntoIndexado()  # Activos con un cliente
 
 class EscritorioServicio:
     def __init__(self, id_escritorio, identificacion, encargado):
@@ -810,7 +1304,9 @@ class EscritorioServicio:
         self.cliente_actual = None
         self.tiempo_restante = 0
         self.punto_atencion = None
+        self.orden = 0  # Posición dentro de los escritorios de su punto
         self.clientes_atendidos = ListaDoblementeEnlazada()
+        self.estadistica_atencion = EstadisticaAcumulada()
 
 class Transaccion:
     def __init__(self, id_transaccion, nombre, tiempo_atencion):
@@ -825,20 +1321,430 @@ class Cliente:
         self.nombre = nombre if isinstance(nombre, MiString) else MiString(nombre)
         self.transacciones = ListaEnlazada()
         self.tiempo_espera = 0  # Tiempo de espera estimado
-        self.tiempo_atencion = 0  # Suma de tiempos de todas las transacciones
+        self._tiempo_atencion = 0  # Suma de tiempos de todas las transacciones
+        self._transacciones_sumadas = 0  # Transacciones incluidas en esa suma
         self.ticket = None
+        self.llegada = None  # Minuto en que llegó a la cola
+        self.turno = None  # Número de orden en el IndiceCola de su punto
+
+    def agregar_transaccion(self, transaccion, cantidad=1):
+        """Agrega la transacción `cantidad` veces y actualiza el tiempo de atención"""
+        vigente = self._transacciones_sumadas == len(self.transacciones)
+        for _ in range(cantidad):
+            self.transacciones.agregar(transaccion)
+        if vigente:
+            self._tiempo_atencion += transaccion.tiempo.a_entero() * cantidad
+            self._transacciones_sumadas += cantidad
+
+    @property
+    def tiempo_atencion(self):
+        """Suma de tiempos de todas las transacciones (en minutos).
+
+        Se mantiene al agregar con agregar_transaccion; si la lista cambió por
+        otra vía, se recalcula una vez en la siguiente lectura.
+        """
+        if self._transacciones_sumadas != len(self.transacciones):
+            total = 0
+            for transaccion in self.transacciones:
+                total += transaccion.tiempo.a_entero()
+            self._tiempo_atencion = total
+            self._transacciones_sumadas = len(self.transacciones)
+        return self._tiempo_atencion
 
     def __str__(self):
         return f"{self.nombre.a_texto()} (DPI: {self.dpi.a_texto()})"
 
+class IndiceCola:
+    """Índice de la cola de espera de un punto para consultas por ticket.
+
+    Asocia cada ticket con su nodo en la cola y numera a los clientes por orden
+    de llegada (turno). Dos árboles de Fenwick sobre los turnos cuentan a los
+    clientes presentes y suman sus minutos de servicio, así que la posición de
+    un cliente y el trabajo que tiene por delante se obtienen en O(log n). Los
+    turnos se renumeran cuando los retirados superan a los presentes.
+
+    Una vez conectado a un sistema mantiene también su índice global
+    ticket -> punto. Si la cola cambia por otra vía (o es una copia
+    serializada), el índice se reconstruye en O(n) en la siguiente consulta:
+    invalidar() lo fuerza y un conteo de presentes distinto del largo de la
+    cola lo delata.
+    """
+    HOLGURA = 1024
+
+    def __init__(self, cola):
+        self.cola = cola
+        self.punto = None
+        self.ubicaciones = None  # ticket -> punto, compartido por todo el sistema
+        self.nodos = None
+        self.vigente = False
+
+    def __getstate__(self):
+        # Los nodos no sobreviven a la copia de la cola; basta con reconstruir
+        return {'cola': self.cola}
+
+    def __setstate__(self, estado):
+        self.__init__(estado['cola'])
+
+    def conectar(self, punto, ubicaciones):
+        """Asocia el índice a su punto y al índice global del sistema."""
+        self.punto = punto
+        self.ubicaciones = ubicaciones
+        self.reconstruir()
+
+    def invalidar(self):
+        # Se conservan los nodos para que reconstruir() olvide sus tickets
+        self.vigente = False
+
+    def reconstruir(self):
+        """Vuelve a indexar la cola completa en O(n)."""
+        if self.nodos is not None and self.ubicaciones is not None:
+            for par in self.nodos.items():
+                self._olvidar_ubicacion(par.clave)
+        self.nodos = DiccionarioPersonalizado()
+        minutos = []
+        turno = 0
+        actual = self.cola.cabeza
+        while actual is not None:
+            cliente = actual.dato
+            cliente.turno = turno
+            if cliente.ticket is not None:
+                self.nodos.agregar(cliente.ticket, actual)
+                if self.ubicaciones is not None:
+                    self.ubicaciones.agregar(cliente.ticket, self.punto)
+            minutos.append(max(cliente.tiempo_atencion, 1))
+            turno += 1
+            actual = actual.siguiente
+        self.presentes = ArbolFenwick([1] * turno)
+        self.minutos = ArbolFenwick(minutos)
+        self.cantidad = turno
+        self.siguiente_turno = turno
+        self.vigente = True
+
+    def _olvidar_ubicacion(self, ticket):
+        if ticket in self.ubicaciones and self.ubicaciones.obtener(ticket) is self.punto:
+            self.ubicaciones.eliminar(ticket)
+
+    def _asegurar(self):
+        if not self.vigente or self.cantidad != self.cola.longitud:
+            self.reconstruir()
+
+    def registrar(self, nodo):
+        """Indexa el nodo recién agregado al final de la cola."""
+        if not self.vigente:
+            return  # Se incluirá al reconstruir
+        if self.siguiente_turno >= 2 * len(self.nodos) + self.HOLGURA:
+            self.reconstruir()  # El nodo ya está en la cola y queda incluido
+            return
+        cliente = nodo.dato
+        cliente.turno = self.siguiente_turno
+        self.siguiente_turno += 1
+        if cliente.ticket is not None:
+            self.nodos.agregar(cliente.ticket, nodo)
+            if self.ubicaciones is not None:
+                self.ubicaciones.agregar(cliente.ticket, self.punto)
+        self.presentes.agregar(cliente.turno, 1)
+        self.minutos.agregar(cliente.turno, max(cliente.tiempo_atencion, 1))
+        self.cantidad += 1
+
+    def retirar(self, cliente):
+        """Descuenta a un cliente que ya salió de la cola.
+
+        Si el cliente nunca fue indexado (llegó a la cola por otra vía), el
+        índice queda invalidado en lugar de descontarlo.
+        """
+        if not self.vigente:
+            return
+        if cliente.turno is None or self.cantidad - 1 != self.cola.longitud:
+            self.invalidar()
+            return
+        if cliente.ticket is not None and cliente.ticket in self.nodos:
+            self.nodos.eliminar(cliente.ticket)
+            if self.ubicaciones is not None:
+                self._olvidar_ubicacion(cliente.ticket)
+        self.presentes.agregar(cliente.turno, -1)
+        self.minutos.agregar(cliente.turno, -max(cliente.tiempo_atencion, 1))
+        self.cantidad -= 1
+        cliente.turno = None
+
+    def nodo_de(self, ticket):
+        self._asegurar()
+        if ticket in self.nodos:
+            return self.nodos.obtener(ticket)
+        return None
+
+    def posicion(self, cliente):
+        """Posición (desde 1) del cliente dentro de la cola."""
+        self._asegurar()
+        return self.presentes.prefijo(cliente.turno + 1)
+
+    def minutos_antes(self, cliente):
+        """Minutos de servicio de los clientes que están antes en la cola."""
+        self._asegurar()
+        return self.minutos.prefijo(cliente.turno)
+
+class RegistroTickets:
+    """Registro compacto de tickets vigentes: un mapa de bits por día.
+
+    Cada día ocupa un bit por ticket posible (~1 MB para los 8.1 millones);
+    solo se conservan los últimos `dias_retencion` días, así que la memoria y
+    el costo de consultar un ticket no crecen con el tiempo de operación.
+    """
+    def __init__(self, tamano, dias_retencion=1):
+        if dias_retencion < 1:
+            raise ValueError("La retención debe ser de al menos un día")
+        self.tamano = tamano
+        self.dias_retencion = dias_retencion
+        self.dias = ListaEnlazada()  # Par(mapa de bits, cantidad), el más reciente al final
+        self.total = 0
+        self.nuevo_dia()
+
+    def __len__(self):
+        return self.total
+
+    def marcar(self, posicion):
+        hoy = self.dias.cola.dato
+        hoy.clave[posicion >> 3] |= 1 << (posicion & 7)
+        hoy.valor += 1
+        self.total += 1
+
+    def marcar_varios(self, posiciones):
+        """Marca en el día actual posiciones que no estaban vigentes."""
+        hoy = self.dias.cola.dato
+        bits = hoy.clave
+        for posicion in posiciones:
+            bits[posicion >> 3] |= 1 << (posicion & 7)
+        hoy.valor += len(posiciones)
+        self.total += len(posiciones)
+
+    def contiene(self, posicion):
+        mascara = 1 << (posicion & 7)
+        for dia in self.dias:
+            if dia.clave[posicion >> 3] & mascara:
+                return True
+        return False
+
+    def nuevo_dia(self):
+        """Abre un día nuevo y libera los tickets de los días fuera de la retención.
+
+        Retorna la cantidad de tickets liberados."""
+        self.dias.agregar(Par(bytearray((self.tamano + 7) // 8), 0))
+        liberados = 0
+        while len(self.dias) > self.dias_retencion:
+            liberados += self.dias.pop(0).valor
+        self.total -= liberados
+        return liberados
+
+class GeneradorTickets:
+    """Emite tickets NNN-NNNN únicos sin reintentos.
+
+    El n-ésimo ticket es la imagen del contador n por la permutación
+    x -> (a * x + b) mod 8 100 000, con `a` coprimo con el tamaño del espacio,
+    así que no se repiten dentro de una vuelta completa del contador. Los
+    tickets emitidos quedan en un RegistroTickets; al dar la vuelta se saltan
+    los que siguen vigentes dentro de la ventana de retención.
+    """
+    ESPACIO = 900 * 9000  # parte1 en 100..999, parte2 en 1000..9999
+
+    def __init__(self, semilla=None, dias_retencion=1):
+        aleatorio = random.Random(semilla)
+        self.a = aleatorio.randrange(1, self.ESPACIO)
+        while math.gcd(self.a, self.ESPACIO) != 1:
+            self.a = aleatorio.randrange(1, self.ESPACIO)
+        self.b = aleatorio.randrange(self.ESPACIO)
+        self.contador = 0
+        self.registro = RegistroTickets(self.ESPACIO, dias_retencion)
+
+    def __len__(self):
+        """Cantidad de tickets vigentes."""
+        return len(self.registro)
+
+    def disponibles(self):
+        return self.ESPACIO - len(self.registro)
+
+    def siguiente(self):
+        if self.disponibles() == 0:
+            raise RuntimeError("Se agotaron los tickets disponibles")
+        while True:
+            x = (self.a * (self.contador % self.ESPACIO) + self.b) % self.ESPACIO
+            self.contador += 1
+            # Solo en la segunda vuelta en adelante puede haber tickets vigentes
+            if self.contador <= self.ESPACIO or not self.registro.contiene(x):
+                self.registro.marcar(x)
+                return f"{100 + x // 9000}-{1000 + x % 9000}"
+
+    def reservar(self, cantidad):
+        """Reserva `cantidad` tickets y los retorna en una ListaEnlazada."""
+        if cantidad > self.disponibles():
+            raise RuntimeError(f"No hay {cantidad} tickets disponibles")
+        tickets = ListaEnlazada()
+        if self.contador + cantidad > self.ESPACIO:
+            # El bloque cruza el fin de la vuelta: hay que saltar los vigentes
+            for _ in range(cantidad):
+                tickets.agregar(self.siguiente())
+            return tickets
+        
+        # Dentro de la primera vuelta la permutación no repite: sin consultas
+        a, b, espacio = self.a, self.b, self.ESPACIO
+        posiciones = [(a * n + b) % espacio for n in range(self.contador, self.contador + cantidad)]
+        self.contador += cantidad
+        self.registro.marcar_varios(posiciones)
+        for x in posiciones:
+            tickets.agregar(f"{100 + x // 9000}-{1000 + x % 9000}")
+        return tickets
+
+    def nuevo_dia(self):
+        """Cambia de día; retorna la cantidad de tickets liberados."""
+        return self.registro.nuevo_dia()
+
+    def __contains__(self, ticket):
+        """Indica si el ticket está vigente."""
+        texto = ticket.a_texto() if hasattr(ticket, 'a_texto') else str(ticket)
+        partes = texto.split('-')
+        if len(partes) != 2 or not partes[0].isdigit() or not partes[1].isdigit():
+            return False
+        parte1, parte2 = int(partes[0]), int(partes[1])
+        if not (100 <= parte1 <= 999 and 1000 <= parte2 <= 9999):
+            return False
+        return self.registro.contiene((parte1 - 100) * 9000 + (parte2 - 1000))
+
+# ==================== SIMULACIÓN POR EVENTOS ====================
+
+class MotorEventos:
+    """Simulación por eventos discretos de un punto de atención.
+
+    En lugar de avanzar minuto a minuto, mantiene un montículo con el minuto en
+    que termina cada escritorio ocupado y salta directamente a la siguiente
+    finalización. Reproduce la semántica de avanzar_tiempo(1): un escritorio
+    termina en el primer minuto en que su tiempo restante llega a cero (al menos
+    un minuto después de recibir al cliente) y, dentro de un mismo minuto, los
+    escritorios se procesan en el orden en que aparecen en el punto.
+    """
+    def __init__(self, sistema, punto, tiempo_inicial):
+        self.sistema = sistema
+        self.punto = punto
+        self.tiempo = tiempo_inicial
+        self.eventos = MonticuloMinimo()
+
+        for escritorio in punto.escritorios_ocupados:
+            self._programar(escritorio, escritorio.orden, tiempo_inicial)
+
+    def _programar(self, escritorio, orden, inicio):
+        """Agenda la finalización del cliente actual del escritorio."""
+        restante = escritorio.tiempo_restante
+        restante = restante.a_entero() if hasattr(restante, 'a_entero') else restante
+        fin = inicio + max(restante, 1)
+        self.eventos.agregar((fin, orden), (escritorio, restante, inicio))
+
+    def siguiente_minuto(self):
+        """Minuto de la próxima finalización, o None si no hay escritorios ocupados."""
+        if len(self.eventos) == 0:
+            return None
+        (fin, _), _ = self.eventos.minimo()
+        return fin
+
+    def procesar_minuto(self, minuto):
+        """Procesa todas las finalizaciones que ocurren en el minuto indicado."""
+        self.tiempo = minuto
+        while len(self.eventos) > 0 and self.siguiente_minuto() == minuto:
+            (_, orden), (escritorio, restante, inicio) = self.eventos.extraer()
+            escritorio.tiempo_restante = MiNumero(restante - (minuto - inicio))
+            self.sistema._finalizar_atencion(self.punto, escritorio, minuto)
+            if escritorio.cliente_actual is not None:
+                self._programar(escritorio, orden, minuto)
+
+    def avanzar_hasta(self, limite):
+        """Procesa todas las finalizaciones hasta el minuto límite inclusive."""
+        while True:
+            minuto = self.siguiente_minuto()
+            if minuto is None or minuto > limite:
+                break
+            self.procesar_minuto(minuto)
+        self.tiempo = limite
+
+    def sincronizar(self):
+        """Escribe en cada escritorio ocupado su tiempo restante al minuto actual."""
+        for i in range(len(self.eventos)):
+            escritorio, restante, inicio = self.eventos.datos[i]
+            escritorio.tiempo_restante = MiNumero(restante - (self.tiempo - inicio))
+
+# Puntos que heredan los procesos creados con fork (no hace falta serializarlos)
+_PUNTOS_COMPARTIDOS = None
+
+def _clientes_de_punto(punto):
+    """Clientes de los escritorios (en orden) seguidos de la cola; base de las posiciones."""
+    clientes = ListaEnlazada()
+    for escritorio in punto.escritorios:
+        if escritorio.cliente_actual is not None:
+            clientes.agregar(escritorio.cliente_actual)
+    for cliente in punto.clientes_en_espera:
+        clientes.agregar(cliente)
+    return clientes
+
+def _simular_particion(particion, inicio, limite):
+    """Avanza en un proceso aparte los puntos de una partición hasta `limite`.
+
+    `particion` son los puntos serializados o sus posiciones en
+    _PUNTOS_COMPARTIDOS. Para no devolver copias de los clientes, el resultado
+    de cada punto los identifica por su posición en _clientes_de_punto:
+    (cantidad que salió de la cola, posiciones de los atendidos, por escritorio
+    (posición del cliente actual o -1, tiempo restante, posiciones de sus
+    atendidos, acumulador), acumuladores de espera y atención, claves del
+    despachador).
+    """
+    if isinstance(particion, bytes):
+        import pickle
+        puntos = pickle.loads(particion)
+    else:
+        puntos = [_PUNTOS_COMPARTIDOS[i] for i in particion]
+    sistema = SistemaAtencion()
+    resultados = []
+    for punto in puntos:
+        posiciones = DiccionarioPersonalizado()
+        indice = 0
+        for cliente in _clientes_de_punto(punto):
+            posiciones.agregar(id(cliente), indice)
+            indice += 1
+        en_cola = len(punto.clientes_en_espera)
+        punto.clientes_atendidos = ListaDoblementeEnlazada()
+        for escritorio in punto.escritorios:
+            escritorio.clientes_atendidos = ListaDoblementeEnlazada()
+        
+        motor = MotorEventos(sistema, punto, inicio)
+        motor.avanzar_hasta(limite)
+        motor.sincronizar()
+        
+        escritorios = []
+        for escritorio in punto.escritorios:
+            actual = escritorio.cliente_actual
+            restante = escritorio.tiempo_restante
+            escritorios.append((
+                posiciones.obtener(id(actual)) if actual is not None else -1,
+                restante.a_entero() if hasattr(restante, 'a_entero') else restante,
+                [posiciones.obtener(id(c)) for c in escritorio.clientes_atendidos],
+                escritorio.estadistica_atencion))
+        resultados.append((
+            en_cola - len(punto.clientes_en_espera),
+            [posiciones.obtener(id(c)) for c in punto.clientes_atendidos],
+            escritorios,
+            punto.estadistica_espera,
+            punto.estadistica_atencion,
+            punto.despacho.claves))
+    return resultados
+
 # ==================== SISTEMA DE ATENCIÓN ====================
 
 class SistemaAtencion:
     def __init__(self):
         self.empresas = ListaEnlazada()
-        self.tickets_generados = ConjuntoPersonalizado()
+        self.indice_empresas = DiccionarioPersonalizado()
+        self.indice_puntos = DiccionarioPersonalizado()
+        self.tickets = GeneradorTickets()
         self.tiempo_simulado = 0
         self.escritorios_activos = ListaEnlazada()
+        self.puntos_ocupados = ConjuntoIndexado()  # Puntos con algún escritorio atendiendo
+        self.puntos_con_cola = ConjuntoIndexado()  # Puntos con clientes en espera
+        self.ubicacion_tickets = DiccionarioPersonalizado()  # Ticket en espera -> punto
+        self.ultimo_error = None  # Mensaje de la última carga fallida
 
     def simular_atencion_completa(self, punto_id):
         """Simula la atención completa de todos los clientes en un punto de atención"""
@@ -846,10 +1752,29 @@ class SistemaAtencion:
         if not punto:
             raise ValueError("Punto de atención no encontrado")
         
-        # Avanzar tiempo hasta que no haya clientes en espera
-        while punto.clientes_en_espera.longitud > 0:
-            self.avanzar_tiempo(1)  # Avanzar de 1 en 1 minuto
-            
+        # Saltar de finalización en finalización hasta que no haya clientes en espera
+        if punto.clientes_en_espera.longitud > 0:
+            if len(self.escritorios_activos) == 0:
+                raise ValueError("No hay escritorios activos para simular.")
+
+            inicio = self.tiempo_simulado.a_entero() if hasattr(self.tiempo_simulado, 'a_entero') else self.tiempo_simulado
+            motor = MotorEventos(self, punto, inicio)
+            while punto.clientes_en_espera.longitud > 0:
+                minuto = motor.siguiente_minuto()
+                if minuto is None:
+                    raise ValueError("No hay escritorios ocupados en el punto; la cola no puede avanzar")
+                motor.procesar_minuto(minuto)
+            motor.sincronizar()
+
+            # El resto de puntos avanza el mismo lapso
+            for otro_punto in self.puntos_ocupados:
+                if otro_punto is not punto:
+                    otro_motor = MotorEventos(self, otro_punto, inicio)
+                    otro_motor.avanzar_hasta(motor.tiempo)
+                    otro_motor.sincronizar()
+
+            self.tiempo_simulado = self.tiempo_simulado + MiNumero(motor.tiempo - inicio)
+
         # Calcular estadísticas del punto
         stats_punto = self.calcular_tiempos_punto(punto)
         
@@ -874,55 +1799,192 @@ class SistemaAtencion:
         if not escritorio.activo:
             escritorio.activo = True
             self.escritorios_activos.agregar(escritorio)
+            punto = escritorio.punto_atencion
+            if punto is not None:
+                punto.total_activos += 1
+                self._reconstruir_despacho(punto)
             return True
         return False
 
-    def desactivar_escritorio(self):
-        """Desactiva el último escritorio activado (LIFO)."""
+    def desactivar_escritorio(self, escritorio=None):
+        """Desactiva el último escritorio activado (LIFO) o, si se indica, ese escritorio.
+
+        Retorna el escritorio desactivado, o None si no había uno activo.
+        """
         if len(self.escritorios_activos) == 0:
             return None
         
-        escritorio = self.escritorios_activos[-1]  # Último elemento
-        self.escritorios_activos.pop()  # Eliminar de la pila
+        if escritorio is None:
+            escritorio = self.escritorios_activos.pop(-1)  # Último elemento de la pila
+        else:
+            if not escritorio.activo:
+                return None
+            posicion = 0
+            for activo in self.escritorios_activos:
+                if activo is escritorio:
+                    break
+                posicion += 1
+            self.escritorios_activos.pop(posicion)
         escritorio.activo = False
         escritorio.cliente_actual = None
+        punto = escritorio.punto_atencion
+        if punto is not None:
+            punto.total_activos -= 1
+            self._reconstruir_despacho(punto)
         return escritorio
 
     def generar_ticket_unico(self):
-        intentos = 0
-        max_intentos = 100  # Prevenir bucles infinitos
-        
-        while intentos < max_intentos:
-            # Generar parte numérica aleatoria
-            parte1 = random.randint(100, 999)
-            parte2 = random.randint(1000, 9999)
-            ticket = f"{parte1}-{parte2}"
-            
-            # Verificar si el ticket ya existe
-            if not self._ticket_existe(ticket):
-                self.tickets_generados.agregar(ticket)
-                return ticket
-            
-            intentos += 1
-        
-        raise RuntimeError("No se pudo generar un ticket único después de múltiples intentos")
+        return self.tickets.siguiente()
+
+    def nuevo_dia(self):
+        """Cierra el día de tickets; los que salen de la retención se pueden reutilizar."""
+        return self.tickets.nuevo_dia()
 
     def _ticket_existe(self, ticket):
         """Verifica si un ticket ya existe en el sistema"""
-        return ticket in self.tickets_generados.diccionario
+        return ticket in self.tickets
+
+    def _ubicar_ticket(self, ticket):
+        """Retorna (punto, nodo en su cola) del cliente que espera con ese ticket."""
+        if isinstance(ticket, MiString):
+            ticket = ticket.a_texto()
+        if ticket not in self.ubicacion_tickets:
+            return None, None
+        punto = self.ubicacion_tickets.obtener(ticket)
+        nodo = punto.indice_cola.nodo_de(ticket)
+        if nodo is None:
+            return None, None
+        return punto, nodo
+
+    def cancelar_ticket(self, ticket):
+        """Retira de la cola al cliente del ticket y lo retorna.
+
+        Retorna None si el ticket no está esperando (no existe, ya fue atendido
+        o está en un escritorio). Es O(log n): las esperas proyectadas de
+        quienes estaban detrás dejan de valer y el despacho del punto se vuelve
+        a proyectar una sola vez, en la siguiente admisión o consulta que lo
+        necesite. Al pasar a un escritorio cada cliente registra la espera que
+        tuvo en realidad.
+        """
+        punto, nodo = self._ubicar_ticket(ticket)
+        if nodo is None:
+            return None
+        cliente = nodo.dato
+        punto.clientes_en_espera.eliminar_nodo(nodo)
+        punto.indice_cola.retirar(cliente)
+        punto.espera_en_cola.quitar(cliente.tiempo_espera)
+        if punto.clientes_en_espera.cabeza is None:
+            self.puntos_con_cola.eliminar(punto)
+        punto.despacho_vigente = False
+        return cliente
+
+    def posicion_de(self, ticket):
+        """Posición (desde 1) del ticket en la cola de su punto, o None si no está esperando."""
+        punto, nodo = self._ubicar_ticket(ticket)
+        if nodo is None:
+            return None
+        return punto.indice_cola.posicion(nodo.dato)
+
+    def espera_estimada(self, ticket):
+        """Minutos que faltan para que el ticket pase a un escritorio.
+
+        Es la proyección exacta del despachador del punto. Tras una
+        cancelación, con un solo escritorio activo la espera es el tiempo que
+        le queda a ese escritorio más los minutos de servicio de la cola por
+        delante, en O(log n); con varios, el despacho se vuelve a proyectar una
+        vez y las consultas siguientes vuelven a ser O(log n). Retorna None si
+        el ticket no está esperando o si su punto no tiene escritorios activos.
+        """
+        punto, nodo = self._ubicar_ticket(ticket)
+        if nodo is None or punto.total_activos == 0:
+            return None
+        cliente = nodo.dato
+        if punto.despacho_vigente and cliente.llegada is not None:
+            return max(cliente.llegada + cliente.tiempo_espera - self._minuto_actual(), 0)
+        
+        if punto.total_activos == 1:
+            pendiente = 0
+            for escritorio in punto.escritorios_ocupados:
+                if escritorio.activo:
+                    restante = escritorio.tiempo_restante
+                    restante = restante.a_entero() if hasattr(restante, 'a_entero') else restante
+                    pendiente += max(restante, 1)
+            return pendiente + punto.indice_cola.minutos_antes(cliente)
+        
+        self._reconstruir_despacho(punto)
+        return max(cliente.llegada + cliente.tiempo_espera - self._minuto_actual(), 0)
 
     def agregar_empresa(self, empresa):
         # Verificar si la empresa ya existe
-        empresa_existente = None
-        for e in self.empresas:
-            if e.id.igual_a(empresa.id):
-                empresa_existente = e
-                break
+        if empresa.id in self.indice_empresas:
+            return False
         
-        if not empresa_existente:
-            self.empresas.agregar(empresa)
-            return True
-        return False
+        self.empresas.agregar(empresa)
+        self.indice_empresas.agregar(empresa.id, empresa)
+        
+        # Indexar lo que la empresa ya traiga consigo
+        for punto in empresa.puntos_atencion:
+            self._indexar_punto(empresa, punto)
+        for transaccion in empresa.transacciones:
+            if transaccion.id not in empresa.indice_transacciones:
+                empresa.indice_transacciones.agregar(transaccion.id, transaccion)
+        return True
+
+    def agregar_punto(self, empresa, punto):
+        """Agrega un punto de atención a la empresa si su ID no existe en ella"""
+        if punto.id in empresa.indice_puntos:
+            return False
+        empresa.puntos_atencion.agregar(punto)
+        self._indexar_punto(empresa, punto)
+        return True
+
+    def _indexar_punto(self, empresa, punto):
+        empresa.indice_puntos.agregar(punto.id, punto)
+        if punto.id not in self.indice_puntos:
+            self.indice_puntos.agregar(punto.id, Par(punto, empresa))
+        punto.indice_cola.conectar(punto, self.ubicacion_tickets)
+        for escritorio in punto.escritorios:
+            escritorio.punto_atencion = punto
+            if escritorio.id not in punto.indice_escritorios:
+                punto.indice_escritorios.agregar(escritorio.id, escritorio)
+
+    def agregar_escritorio(self, punto, escritorio):
+        """Agrega un escritorio al punto si su ID no existe en él"""
+        if escritorio.id in punto.indice_escritorios:
+            return False
+        escritorio.punto_atencion = punto
+        escritorio.orden = len(punto.escritorios)
+        punto.escritorios.agregar(escritorio)
+        punto.indice_escritorios.agregar(escritorio.id, escritorio)
+        return True
+
+    def agregar_transaccion(self, empresa, transaccion):
+        """Agrega una transacción a la empresa si su ID no existe en ella"""
+        if transaccion.id in empresa.indice_transacciones:
+            return False
+        empresa.transacciones.agregar(transaccion)
+        empresa.indice_transacciones.agregar(transaccion.id, transaccion)
+        return True
+
+    def _buscar_empresa_por_id(self, empresa_id):
+        if empresa_id in self.indice_empresas:
+            return self.indice_empresas.obtener(empresa_id)
+        return None
+
+    def _buscar_punto_por_id(self, empresa, punto_id):
+        if punto_id in empresa.indice_puntos:
+            return empresa.indice_puntos.obtener(punto_id)
+        return None
+
+    def _buscar_escritorio_por_id(self, punto, escritorio_id):
+        if escritorio_id in punto.indice_escritorios:
+            return punto.indice_escritorios.obtener(escritorio_id)
+        return None
+
+    def _buscar_transaccion(self, empresa, transaccion_id):
+        if transaccion_id in empresa.indice_transacciones:
+            return empresa.indice_transacciones.obtener(transaccion_id)
+        return None
 
     def _crear_cliente_desde_xml(self, cliente_xml, empresa):
         dpi = MiString(cliente_xml.get('dpi'))
@@ -939,413 +2001,701 @@ class SistemaAtencion:
                 
                 transaccion = self._buscar_transaccion(empresa, trans_id)
                 if transaccion:
-                    for _ in range(cantidad):
-                        cliente.transacciones.agregar(transaccion)
+                    cliente.agregar_transaccion(transaccion, cantidad)
         
-        # Calcular tiempo total como MiNumero
-        tiempo_total = MiNumero(0)
-        actual = cliente.transacciones.cabeza
-        while actual is not None:
-            tiempo_trans = actual.dato.tiempo
-            if not isinstance(tiempo_trans, MiNumero):
-                tiempo_trans = MiNumero(int(tiempo_trans))
-            tiempo_total += tiempo_trans
-            actual = actual.siguiente
-        
-        cliente.tiempo_atencion = tiempo_total
         cliente.tiempo_espera = MiNumero(0)  # Se calculará después
-        cliente.ticket = self.generar_ticket_unico()
         
         return cliente
 
     def asignar_cliente_a_escritorio(self, escritorio, cliente):
         if escritorio.activo and escritorio.cliente_actual is None:
             escritorio.cliente_actual = cliente
-            escritorio.tiempo_restante = sum(t.tiempo.a_entero() if hasattr(t.tiempo, 'a_entero') else t.tiempo 
-                                      for t in cliente.transacciones)
+            escritorio.tiempo_restante = cliente.tiempo_atencion
+            punto = escritorio.punto_atencion
+            if punto is not None:
+                punto.escritorios_ocupados.agregar(escritorio)
+                self.puntos_ocupados.agregar(punto)
             return True
         return False
 
+    def _actualizar_actividad(self, punto):
+        """Sincroniza con el punto sus escritorios ocupados y los conjuntos de actividad."""
+        orden = 0
+        for escritorio in punto.escritorios:
+            escritorio.orden = orden
+            if escritorio.activo and escritorio.cliente_actual is not None:
+                punto.escritorios_ocupados.agregar(escritorio)
+            else:
+                punto.escritorios_ocupados.eliminar(escritorio)
+            orden += 1
+        if len(punto.escritorios_ocupados) > 0:
+            self.puntos_ocupados.agregar(punto)
+        else:
+            self.puntos_ocupados.eliminar(punto)
+        if punto.clientes_en_espera.cabeza is not None:
+            self.puntos_con_cola.agregar(punto)
+        else:
+            self.puntos_con_cola.eliminar(punto)
+
+    def hay_actividad(self):
+        """Si algún escritorio está atendiendo o algún punto tiene clientes en cola, en O(1)."""
+        return len(self.puntos_ocupados) > 0 or len(self.puntos_con_cola) > 0
+
     def asignar_cliente(self, punto_atencion, cliente):
         try:
             # Verificar tipos
             if not isinstance(cliente.dpi, MiString) or not isinstance(cliente.nombre, MiString):
                 raise ValueError("Los datos del cliente deben ser MiString")
             
-            # Calcular tiempo total de atención
-            tiempo_total = sum(t.tiempo.a_entero() if hasattr(t.tiempo, 'a_entero') else t.tiempo 
-                          for t in cliente.transacciones)
+            # Tiempo total de atención (precalculado en el cliente)
+            tiempo_total = cliente.tiempo_atencion
             
             # Generar ticket único
             cliente.ticket = self.generar_ticket_unico()
             
-            # Contar escritorios activos
-            escritorios_activos = sum(1 for e in punto_atencion.escritorios if e.activo)
-            
-            if escritorios_activos == 0:
+            if punto_atencion.total_activos == 0:
                 raise ValueError("No hay escritorios activos en este punto de atención")
             
-            # Calcular tiempo de espera estimado
-            tiempo_espera = 0
-            if len(punto_atencion.clientes_en_espera) > 0:
-                # Sumar tiempos de los clientes en la misma "fila virtual"
-                posicion = len(punto_atencion.clientes_en_espera)
-                fila_virtual = posicion // escritorios_activos
-                
-                for i in range(fila_virtual * escritorios_activos, posicion):
-                    if i < len(punto_atencion.clientes_en_espera):
-                        cliente_anterior = punto_atencion.clientes_en_espera[i]
-                        tiempo_cliente = sum(t.tiempo.a_entero() if hasattr(t.tiempo, 'a_entero') else t.tiempo 
-                                      for t in cliente_anterior.transacciones)
-                        tiempo_espera += tiempo_cliente
+            # El despachador le reserva el escritorio que se libera primero
+            if not punto_atencion.despacho_vigente:
+                self._reconstruir_despacho(punto_atencion)
+            cliente.llegada = self._minuto_actual()
+            escritorio = self._proyectar_cliente(punto_atencion, cliente)
+            
+            # Si ese escritorio está libre ahora lo atiende de inmediato; si no, espera en cola
+            if (cliente.tiempo_espera == 0 and escritorio.cliente_actual is None
+                    and len(punto_atencion.clientes_en_espera) == 0):
+                self.asignar_cliente_a_escritorio(escritorio, cliente)
+            else:
+                nodo = punto_atencion.clientes_en_espera.agregar(cliente)
+                punto_atencion.indice_cola.registrar(nodo)
+                punto_atencion.espera_en_cola.agregar(cliente.tiempo_espera)
+                self.puntos_con_cola.agregar(punto_atencion)
+            
+            return cliente.ticket, cliente.tiempo_espera, tiempo_total
+        
+        except Exception as e:
+            error_msg = f"Error al asignar cliente: {str(e)}"
+            print(error_msg)
+            raise RuntimeError(error_msg)
+
+    def asignar_clientes_lote(self, punto_atencion, clientes):
+        """Admite varios clientes a la vez, en el orden dado.
+
+        Reserva todos los tickets en un bloque, calcula la espera de cada
+        cliente con el despachador del punto sin recorrer la cola existente y
+        agrega a la cola los que deben esperar con un solo enlace. Retorna una
+        ListaEnlazada con (ticket, tiempo_espera, tiempo_atencion) por cliente.
+        """
+        try:
+            for cliente in clientes:
+                if not isinstance(cliente.dpi, MiString) or not isinstance(cliente.nombre, MiString):
+                    raise ValueError("Los datos del cliente deben ser MiString")
             
-            cliente.tiempo_espera = tiempo_espera
+            if punto_atencion.total_activos == 0:
+                raise ValueError("No hay escritorios activos en este punto de atención")
             
-            # Agregar cliente al final de la cola
-            punto_atencion.clientes_en_espera.agregar(cliente)
+            tickets = self.tickets.reservar(len(clientes))
+            if not punto_atencion.despacho_vigente:
+                self._reconstruir_despacho(punto_atencion)
+            ahora = self._minuto_actual()
             
-            # Intentar asignar a escritorio disponible
-            for escritorio in punto_atencion.escritorios:
-                if escritorio.activo and escritorio.cliente_actual is None:
+            en_espera = ListaDoblementeEnlazada()
+            resultados = ListaEnlazada()
+            for cliente, ticket in zip(clientes, tickets):
+                cliente.ticket = ticket
+                cliente.llegada = ahora
+                escritorio = self._proyectar_cliente(punto_atencion, cliente, ahora)
+                if (cliente.tiempo_espera == 0 and escritorio.cliente_actual is None
+                        and len(punto_atencion.clientes_en_espera) == 0 and len(en_espera) == 0):
                     self.asignar_cliente_a_escritorio(escritorio, cliente)
-                    break
+                else:
+                    en_espera.agregar(cliente)
+                    punto_atencion.espera_en_cola.agregar(cliente.tiempo_espera)
+                resultados.agregar((cliente.ticket, cliente.tiempo_espera, cliente.tiempo_atencion))
             
-            return cliente.ticket, cliente.tiempo_espera, tiempo_total
+            nodo = en_espera.cabeza
+            if nodo is not None:
+                self.puntos_con_cola.agregar(punto_atencion)
+            punto_atencion.clientes_en_espera.extender(en_espera)
+            while nodo is not None:  # Los nodos enlazados siguen siendo los mismos
+                punto_atencion.indice_cola.registrar(nodo)
+                nodo = nodo.siguiente
+            return resultados
         
         except Exception as e:
-            error_msg = f"Error al asignar cliente: {str(e)}"
+            error_msg = f"Error al asignar clientes: {str(e)}"
             print(error_msg)
             raise RuntimeError(error_msg)
 
     def avanzar_tiempo(self, minutos):
+        """Avanza la simulación `minutos` minutos.
+
+        Procesa en orden cronológico todas las finalizaciones del intervalo y
+        cada escritorio que se libera toma al siguiente de la cola en ese mismo
+        minuto. El trabajo es proporcional a las finalizaciones, no a los minutos.
+        """
         if len(self.escritorios_activos) == 0:
             raise ValueError("No hay escritorios activos para simular.")
         
         # Convertir minutos a MiNumero si es necesario
         minutos_mi = minutos if isinstance(minutos, MiNumero) else MiNumero(minutos)
+        inicio = self._minuto_actual()
+        limite = inicio + minutos_mi.a_entero()
+        
+        # Solo avanzan los puntos con escritorios ocupados. Cada uno salta de
+        # finalización en finalización dentro del intervalo, así que un salto
+        # largo atiende a todos los clientes que le tocan y da lo mismo que
+        # avanzar de a un minuto
+        for punto in self.puntos_ocupados:
+            motor = MotorEventos(self, punto, inicio)
+            motor.avanzar_hasta(limite)
+            motor.sincronizar()
         self.tiempo_simulado = self.tiempo_simulado + minutos_mi
-        
-        for empresa in self.empresas:
-            for punto in empresa.puntos_atencion:
-                for escritorio in punto.escritorios:
-                    if escritorio.activo and escritorio.cliente_actual:
-                        escritorio.tiempo_restante = escritorio.tiempo_restante - minutos_mi
-                        
-                        # Usar comparación personalizada
-                        if escritorio.tiempo_restante <= MiNumero(0):
-                            punto.clientes_atendidos.agregar(escritorio.cliente_actual)
-                            escritorio.clientes_atendidos.agregar(escritorio.cliente_actual)
-                            escritorio.cliente_actual = None
-                            
-                            # Asignar siguiente cliente (FIFO)
-                            if len(punto.clientes_en_espera) > 0:
-                                siguiente_cliente = punto.clientes_en_espera[0]
-                                punto.clientes_en_espera.pop(0)
-                                self.asignar_cliente_a_escritorio(escritorio, siguiente_cliente)
 
-    def calcular_tiempos_punto(self, punto):
-        tiempos_espera = ListaEnlazada()
-        tiempos_atencion = ListaEnlazada()
+    def avanzar_tiempo_paralelo(self, minutos, procesos=None):
+        """Avanza todos los puntos `minutos` minutos repartiéndolos entre procesos.
+
+        Equivale a avanzar_tiempo(minutos): cada punto se simula por eventos de
+        forma independiente y los resultados se incorporan en el orden de los
+        puntos, así que no dependen de la cantidad de procesos.
+        """
+        global _PUNTOS_COMPARTIDOS
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        if len(self.escritorios_activos) == 0:
+            raise ValueError("No hay escritorios activos para simular.")
+        
+        inicio = self._minuto_actual()
+        limite = inicio + minutos
+        procesos = procesos or os.cpu_count() or 1
         
-        for cliente in punto.clientes_atendidos:
-            tiempo = sum(t.tiempo.a_entero() if hasattr(t.tiempo, 'a_entero') else t.tiempo 
-                    for t in cliente.transacciones)
-            tiempos_atencion.agregar(tiempo)
-            tiempo_espera = cliente.tiempo_espera.a_entero() if hasattr(cliente.tiempo_espera, 'a_entero') else cliente.tiempo_espera
-            tiempos_espera.agregar(tiempo_espera - tiempo)
+        # Solo hay trabajo en los puntos con algún escritorio ocupado
+        puntos = list(self.puntos_ocupados)
         
+        if procesos == 1 or len(puntos) <= 1:
+            for punto in puntos:
+                motor = MotorEventos(self, punto, inicio)
+                motor.avanzar_hasta(limite)
+                motor.sincronizar()
+        else:
+            # Los procesos no devuelven la espera de quienes pasan a un
+            # escritorio; con el despacho al día es la que ya tienen proyectada
+            for punto in puntos:
+                if not punto.despacho_vigente and punto.clientes_en_espera.cabeza is not None:
+                    self._reconstruir_despacho(punto)
+            
+            # Particiones contiguas; con fork los procesos heredan los puntos
+            tamano = -(-len(puntos) // (procesos * 2))
+            rangos = [range(i, min(i + tamano, len(puntos))) for i in range(0, len(puntos), tamano)]
+            if 'fork' in multiprocessing.get_all_start_methods():
+                contexto = multiprocessing.get_context('fork')
+                _PUNTOS_COMPARTIDOS = puntos
+                particiones = [tuple(rango) for rango in rangos]
+                # Sin esto el recolector de cada proceso recorre (y copia) todo el heap heredado
+                gc.freeze()
+            else:
+                contexto = None
+                particiones = [self._serializar_particion([puntos[i] for i in rango]) for rango in rangos]
+            
+            try:
+                with ProcessPoolExecutor(max_workers=min(procesos, len(particiones)), mp_context=contexto) as ejecutor:
+                    resultados = ejecutor.map(_simular_particion, particiones,
+                                              [inicio] * len(particiones), [limite] * len(particiones))
+                    for rango, resultado in zip(rangos, resultados):
+                        for i, datos in zip(rango, resultado):
+                            self._fusionar_punto(puntos[i], datos)
+            finally:
+                _PUNTOS_COMPARTIDOS = None
+                gc.unfreeze()
+        
+        self.tiempo_simulado = self.tiempo_simulado + MiNumero(minutos)
+
+    def _serializar_particion(self, puntos):
+        """Serializa los puntos sin sus listas de atendidos, que el proceso no necesita."""
+        import pickle
+        historiales = []
+        for punto in puntos:
+            historiales.append((punto.clientes_atendidos, [e.clientes_atendidos for e in punto.escritorios]))
+            punto.clientes_atendidos = ListaDoblementeEnlazada()
+            for escritorio in punto.escritorios:
+                escritorio.clientes_atendidos = ListaDoblementeEnlazada()
+        try:
+            return pickle.dumps(puntos, pickle.HIGHEST_PROTOCOL)
+        finally:
+            for punto, (atendidos, de_escritorios) in zip(puntos, historiales):
+                punto.clientes_atendidos = atendidos
+                for escritorio, lista in zip(punto.escritorios, de_escritorios):
+                    escritorio.clientes_atendidos = lista
+
+    def _fusionar_punto(self, punto, datos):
+        """Aplica al punto el resultado de _simular_particion."""
+        salidos, atendidos, escritorios_datos, espera, atencion, claves = datos
+        clientes = _clientes_de_punto(punto)
+        for _ in range(salidos):
+            cliente = punto.clientes_en_espera.popleft()
+            punto.indice_cola.retirar(cliente)
+            punto.espera_en_cola.quitar(cliente.tiempo_espera)
+            clientes.agregar(cliente)
+        clientes = list(clientes)  # Acceso por posición en O(1)
+        
+        for posicion in atendidos:
+            punto.clientes_atendidos.agregar(clientes[posicion])
+        punto.estadistica_espera = espera
+        punto.estadistica_atencion = atencion
+        
+        escritorios = list(punto.escritorios)
+        for escritorio, (actual, restante, suyos, estadistica) in zip(escritorios, escritorios_datos):
+            escritorio.cliente_actual = clientes[actual] if actual >= 0 else None
+            escritorio.tiempo_restante = MiNumero(restante)
+            for posicion in suyos:
+                escritorio.clientes_atendidos.agregar(clientes[posicion])
+            escritorio.estadistica_atencion = estadistica
+        
+        # El montículo del despachador debe apuntar a los escritorios originales
+        punto.despacho = MonticuloMinimo()
+        punto.despacho.claves = claves
+        punto.despacho.datos = [escritorios[orden] for _, orden in claves]
+        self._actualizar_actividad(punto)
+
+    def _finalizar_atencion(self, punto, escritorio, ahora):
+        """Registra al cliente del escritorio como atendido y asigna el siguiente (FIFO).
+
+        El siguiente registra la espera real hasta `ahora`, que coincide con la
+        proyectada salvo que una cancelación la haya dejado atrasada.
+        """
+        cliente = escritorio.cliente_actual
+        punto.clientes_atendidos.agregar(cliente)
+        escritorio.clientes_atendidos.agregar(cliente)
+        punto.estadistica_espera.agregar(cliente.tiempo_espera)
+        punto.estadistica_atencion.agregar(cliente.tiempo_atencion)
+        escritorio.estadistica_atencion.agregar(cliente.tiempo_atencion)
+        escritorio.cliente_actual = None
+
+        if punto.clientes_en_espera.cabeza is not None:
+            siguiente_cliente = punto.clientes_en_espera.popleft()
+            punto.indice_cola.retirar(siguiente_cliente)
+            punto.espera_en_cola.quitar(siguiente_cliente.tiempo_espera)
+            if siguiente_cliente.llegada is not None:
+                siguiente_cliente.tiempo_espera = ahora - siguiente_cliente.llegada
+            if punto.clientes_en_espera.cabeza is None:
+                self.puntos_con_cola.eliminar(punto)
+            self.asignar_cliente_a_escritorio(escritorio, siguiente_cliente)
+        else:
+            punto.escritorios_ocupados.eliminar(escritorio)
+            if len(punto.escritorios_ocupados) == 0:
+                self.puntos_ocupados.eliminar(punto)
+
+    def _minuto_actual(self):
+        return self.tiempo_simulado.a_entero() if hasattr(self.tiempo_simulado, 'a_entero') else self.tiempo_simulado
+
+    def _proyectar_cliente(self, punto, cliente, ahora=None):
+        """Reserva para el cliente el escritorio que se libera primero en O(log escritorios).
+
+        Fija la espera exacta del cliente desde su llegada y retorna el escritorio.
+        """
+        if ahora is None:
+            ahora = self._minuto_actual()
+        (libre, orden), escritorio = punto.despacho.minimo()
+        inicio = max(libre, ahora)
+        punto.despacho.reemplazar_minimo((inicio + max(cliente.tiempo_atencion, 1), orden), escritorio)
+        cliente.tiempo_espera = inicio - cliente.llegada
+        return escritorio
+
+    def _reconstruir_despacho(self, punto):
+        """Llena los escritorios libres con la cola y recalcula las esperas exactas.
+
+        Cada escritorio activo entra al montículo con el minuto en que queda
+        libre; los clientes en cola toman, en orden, el que se libere primero
+        (a igual minuto, el que aparece antes en el punto), igual que al simular.
+        """
+        ahora = self._minuto_actual()
+        punto.despacho = MonticuloMinimo()
+        orden = 0
+        for escritorio in punto.escritorios:
+            if escritorio.activo:
+                if escritorio.cliente_actual is None and punto.clientes_en_espera.cabeza is not None:
+                    cliente = punto.clientes_en_espera.popleft()
+                    punto.indice_cola.retirar(cliente)
+                    if cliente.llegada is None:
+                        cliente.llegada = ahora
+                    cliente.tiempo_espera = ahora - cliente.llegada
+                    self.asignar_cliente_a_escritorio(escritorio, cliente)
+                libre = ahora
+                if escritorio.cliente_actual is not None:
+                    restante = escritorio.tiempo_restante
+                    restante = restante.a_entero() if hasattr(restante, 'a_entero') else restante
+                    libre += max(restante, 1)
+                punto.despacho.agregar((libre, orden), escritorio)
+            orden += 1
+        self._actualizar_actividad(punto)
+        
+        punto.despacho_vigente = len(punto.despacho) > 0
+        if not punto.despacho_vigente:
+            return
+        punto.espera_en_cola = EstadisticaReversible()
         for cliente in punto.clientes_en_espera:
-            tiempo_espera = cliente.tiempo_espera.a_entero() if hasattr(cliente.tiempo_espera, 'a_entero') else cliente.tiempo_espera
-            tiempos_espera.agregar(tiempo_espera)
-        
-        def maximo(lista):
-            max_val = 0
-            for item in lista:
-                val = item.a_entero() if hasattr(item, 'a_entero') else item
-                if val > max_val:
-                    max_val = val
-            return max_val
-        
-        def minimo(lista):
-            if len(lista) == 0:
-                return 0
-            min_val = float('inf')
-            for item in lista:
-                val = item.a_entero() if hasattr(item, 'a_entero') else item
-                if val < min_val:
-                    min_val = val
-            return min_val
-        
-        def promedio(lista):
-            if len(lista) == 0:
-                return 0
-            total = 0
-            count = 0
-            for item in lista:
-                val = item.a_entero() if hasattr(item, 'a_entero') else item
-                total += val
-                count += 1
-            return total / count
+            if cliente.llegada is None:
+                cliente.llegada = ahora
+            self._proyectar_cliente(punto, cliente, ahora)
+            punto.espera_en_cola.agregar(cliente.tiempo_espera)
+
+    def calcular_tiempos_punto(self, punto):
+        """Estadísticas del punto a partir de sus acumuladores, en O(1).
+
+        Las esperas y atenciones son las de los atendidos; las esperas
+        proyectadas de quienes siguen en cola se informan aparte (*_cola). Si
+        una cancelación dejó atrasadas esas proyecciones, o la cola cambió por
+        otra vía, se vuelven a calcular una vez antes de informarlas.
+        """
+        # Un conteo distinto del largo de la cola indica clientes agregados por otra vía
+        desfasada = punto.espera_en_cola.cantidad != punto.clientes_en_espera.longitud
+        if ((desfasada or not punto.despacho_vigente) and punto.total_activos > 0
+                and punto.clientes_en_espera.cabeza is not None):
+            self._reconstruir_despacho(punto)
+        elif desfasada:
+            punto.espera_en_cola = EstadisticaReversible()
+            for cliente in punto.clientes_en_espera:
+                punto.espera_en_cola.agregar(cliente.tiempo_espera)
+        espera = punto.estadistica_espera
+        en_cola = punto.espera_en_cola
+        atencion = punto.estadistica_atencion
         
         stats = {
-            "max_espera": maximo(tiempos_espera),
-            "min_espera": minimo(tiempos_espera),
-            "promedio_espera": promedio(tiempos_espera),
-            "max_atencion": maximo(tiempos_atencion),
-            "min_atencion": minimo(tiempos_atencion),
-            "promedio_atencion": promedio(tiempos_atencion),
-            "total_clientes": len(punto.clientes_atendidos)
+            "max_espera": espera.maximo or 0,
+            "min_espera": espera.minimo or 0,
+            "promedio_espera": espera.promedio(),
+            "desviacion_espera": espera.desviacion(),
+            "p50_espera": espera.percentil(50),
+            "p90_espera": espera.percentil(90),
+            "p99_espera": espera.percentil(99),
+            "max_atencion": atencion.maximo or 0,
+            "min_atencion": atencion.minimo or 0,
+            "promedio_atencion": atencion.promedio(),
+            "desviacion_atencion": atencion.desviacion(),
+            "p50_atencion": atencion.percentil(50),
+            "p90_atencion": atencion.percentil(90),
+            "p99_atencion": atencion.percentil(99),
+            "total_clientes": len(atencion),
+            "clientes_en_cola": en_cola.cantidad,
+            "promedio_espera_cola": en_cola.promedio(),
+            "desviacion_espera_cola": en_cola.desviacion()
         }
         
         return stats
 
     def calcular_tiempos_escritorio(self, escritorio):
-        tiempos = ListaEnlazada()
-        
-        for cliente in escritorio.clientes_atendidos:
-            tiempo = sum(t.tiempo.a_entero() if hasattr(t.tiempo, 'a_entero') else t.tiempo 
-                    for t in cliente.transacciones)
-            tiempos.agregar(tiempo)
-
-        def maximo(lista):
-            max_val = 0
-            for item in lista:
-                val = item.a_entero() if hasattr(item, 'a_entero') else item
-                if val > max_val:
-                    max_val = val
-            return max_val
-        
-        def minimo(lista):
-            if len(lista) == 0:
-                return 0
-            min_val = float('inf')
-            for item in lista:
-                val = item.a_entero() if hasattr(item, 'a_entero') else item
-                if val < min_val:
-                    min_val = val
-            return min_val
-        
-        def promedio(lista):
-            if len(lista) == 0:
-                return 0
-            total = 0
-            count = 0
-            for item in lista:
-                val = item.a_entero() if hasattr(item, 'a_entero') else item
-                total += val
-                count += 1
-            return total / count
-        
+        atencion = escritorio.estadistica_atencion
         stats = {
-            "max_atencion": maximo(tiempos),
-            "min_atencion": minimo(tiempos),
-            "promedio_atencion": promedio(tiempos),
-            "total_clientes": len(escritorio.clientes_atendidos)
+            "max_atencion": atencion.maximo or 0,
+            "min_atencion": atencion.minimo or 0,
+            "promedio_atencion": atencion.promedio(),
+            "desviacion_atencion": atencion.desviacion(),
+            "p50_atencion": atencion.percentil(50),
+            "p90_atencion": atencion.percentil(90),
+            "p99_atencion": atencion.percentil(99),
+            "total_clientes": len(atencion)
         }
         
         return stats
 
-    def cargar_configuracion_xml(self, filepath):
+    def cargar_configuracion_xml(self, filepath, progreso=None):
+        """Carga la configuración leyendo el XML de forma incremental.
+
+        Cada escritorio, punto, transacción y empresa se construye al cerrarse
+        su elemento, que luego se descarta, así que la memoria no depende del
+        tamaño del archivo. Si se indica, progreso(procesados) recibe la
+        cantidad de entidades construidas hasta el momento.
+        """
         try:
-            # Parsear el XML usando ElementTree (esto es temporal para la transición)
-            tree = ET.parse(filepath)
-            root = tree.getroot()
-            
             # Limpiar el sistema antes de cargar nueva configuración
             self.limpiar_sistema()
             
-            # Procesar cada empresa en el XML
-            for empresa_xml in root.findall('empresa'):
-                id_empresa = empresa_xml.get('id')
-                nombre = empresa_xml.find('nombre').text.strip()
-                abreviatura = empresa_xml.find('abreviatura').text.strip()
-                
-                # Crear la empresa usando MiString para los textos
-                empresa = Empresa(
-                    MiString(id_empresa),
-                    MiString(nombre),
-                    MiString(abreviatura)
-                )
+            abiertos = ListaEnlazada()  # Pila de elementos abiertos
+            escritorios = ListaEnlazada()
+            puntos = ListaEnlazada()
+            transacciones = ListaEnlazada()
+            procesados = 0
+            
+            import xml.etree.ElementTree as ET
+            for evento, elem in ET.iterparse(filepath, events=('start', 'end')):
+                if evento == 'start':
+                    abiertos.agregar(elem)
+                    continue
                 
-                # Procesar puntos de atención
-                puntos_xml = empresa_xml.find('listaPuntosAtencion')
-                if puntos_xml is not None:
-                    for punto_xml in puntos_xml.findall('puntoAtencion'):
-                        id_punto = punto_xml.get('id')
-                        nombre_punto = punto_xml.find('nombre').text.strip()
-                        direccion = punto_xml.find('direccion').text.strip()
-                        
-                        punto = PuntoAtencion(
-                            MiString(id_punto),
-                            MiString(nombre_punto),
-                            MiString(direccion)
-                        )
-                        
-                        # Procesar escritorios
-                        escritorios_xml = punto_xml.find('listaEscritorios')
-                        if escritorios_xml is not None:
-                            for escritorio_xml in escritorios_xml.findall('escritorio'):
-                                id_escritorio = escritorio_xml.get('id')
-                                identificacion = escritorio_xml.find('identificacion').text.strip()
-                                encargado = escritorio_xml.find('encargado').text.strip()
-                                
-                                escritorio = EscritorioServicio(
-                                    MiString(id_escritorio),
-                                    MiString(identificacion),
-                                    MiString(encargado)
-                                )
-                                punto.escritorios.agregar(escritorio)
-                        
-                        empresa.puntos_atencion.agregar(punto)
+                abiertos.pop(-1)
+                padre = abiertos[-1] if len(abiertos) > 0 else None
+                padre_tag = padre.tag if padre is not None else None
                 
-                # Procesar transacciones
-                transacciones_xml = empresa_xml.find('listaTransacciones')
-                if transacciones_xml is not None:
-                    for trans_xml in transacciones_xml.findall('transaccion'):
-                        id_trans = trans_xml.get('id')
-                        nombre_trans = trans_xml.find('nombre').text.strip()
-                        tiempo = int(trans_xml.find('tiempoAtencion').text.strip())
-                        
-                        transaccion = Transaccion(
-                            MiString(id_trans),
-                            MiString(nombre_trans),
-                            MiNumero(tiempo)
-                        )
-                        empresa.transacciones.agregar(transaccion)
+                if elem.tag == 'escritorio' and padre_tag == 'listaEscritorios':
+                    escritorios.agregar(EscritorioServicio(
+                        MiString(elem.get('id')),
+                        MiString(elem.find('identificacion').text.strip()),
+                        MiString(elem.find('encargado').text.strip())
+                    ))
+                elif elem.tag == 'puntoAtencion' and padre_tag == 'listaPuntosAtencion':
+                    punto = PuntoAtencion(
+                        MiString(elem.get('id')),
+                        MiString(elem.find('nombre').text.strip()),
+                        MiString(elem.find('direccion').text.strip())
+                    )
+                    for escritorio in escritorios:
+                        self.agregar_escritorio(punto, escritorio)
+                    escritorios = ListaEnlazada()
+                    puntos.agregar(punto)
+                elif elem.tag == 'transaccion' and padre_tag == 'listaTransacciones':
+                    transacciones.agregar(Transaccion(
+                        MiString(elem.get('id')),
+                        MiString(elem.find('nombre').text.strip()),
+                        MiNumero(int(elem.find('tiempoAtencion').text.strip()))
+                    ))
+                elif elem.tag == 'empresa':
+                    # Crear la empresa usando MiString para los textos
+                    empresa = Empresa(
+                        MiString(elem.get('id')),
+                        MiString(elem.find('nombre').text.strip()),
+                        MiString(elem.find('abreviatura').text.strip())
+                    )
+                    if self.agregar_empresa(empresa):
+                        for punto in puntos:
+                            self.agregar_punto(empresa, punto)
+                        for transaccion in transacciones:
+                            self.agregar_transaccion(empresa, transaccion)
+                    puntos = ListaEnlazada()
+                    transacciones = ListaEnlazada()
+                else:
+                    continue
                 
-                self.empresas.agregar(empresa)
+                # Entidad construida: soltar el elemento para liberar su subárbol
+                procesados += 1
+                if padre is not None:
+                    padre.remove(elem)
+                if progreso:
+                    progreso(procesados)
             
             return len(self.empresas) > 0
             
         except Exception as e:
             error_msg = f"Error al cargar configuración XML: {str(e)}"
             print(error_msg)
+            self.ultimo_error = error_msg
             return False
 
-    def cargar_estado_inicial_xml(self, archivo):
+    def cargar_estado_inicial_xml(self, archivo, progreso=None):
+        """Carga el estado inicial leyendo el XML de forma incremental.
+
+        Cada cliente se crea y se encola al cerrarse su elemento, que luego se
+        descarta; los tickets de los clientes de cada configInicial se reservan
+        en bloque al cerrarse ese elemento. Si se indica, progreso(procesados)
+        recibe la cantidad de clientes cargados hasta el momento.
+        """
         try:
             if len(self.empresas) == 0:
                 raise ValueError("Primero cargue el archivo de configuración")
-                
-            tree = ET.parse(archivo)
-            root = tree.getroot()
             
-            for config_xml in root.findall('configInicial'):
-                empresa_id = MiString(config_xml.get('idEmpresa'))
-                punto_id = MiString(config_xml.get('idPunto'))
-                
-                # Buscar empresa y punto
-                empresa = self._buscar_empresa_por_id(empresa_id)
-                if not empresa:
-                    continue
-                    
-                punto = self._buscar_punto_por_id(empresa, punto_id)
-                if not punto:
+            abiertos = ListaEnlazada()  # Pila de elementos abiertos
+            empresa = None
+            punto = None
+            nuevos = ListaEnlazada()  # Clientes de la configInicial actual
+            procesados = 0
+            
+            import xml.etree.ElementTree as ET
+            for evento, elem in ET.iterparse(archivo, events=('start', 'end')):
+                if evento == 'start':
+                    abiertos.agregar(elem)
+                    if elem.tag == 'configInicial':
+                        # Buscar empresa y punto con los atributos de apertura
+                        empresa = self._buscar_empresa_por_id(MiString(elem.get('idEmpresa')))
+                        punto = None
+                        if empresa:
+                            punto = self._buscar_punto_por_id(empresa, MiString(elem.get('idPunto')))
+                        nuevos = ListaEnlazada()
                     continue
                 
-                # Activar escritorios
-                escritorios_activos = ListaEnlazada()
-                escritorios_xml = config_xml.find('escritoriosActivos')
-                if escritorios_xml is not None:
-                    for esc_xml in escritorios_xml.findall('escritorio'):
-                        esc_id = MiString(esc_xml.get('idEscritorio'))
-                        escritorio = self._buscar_escritorio_por_id(punto, esc_id)
-                        
-                        if escritorio:
-                            escritorio.activo = True
-                            escritorio.tiempo_restante = MiNumero(0)
-                            escritorios_activos.agregar(escritorio)
-                            self.escritorios_activos.agregar(escritorio)
+                abiertos.pop(-1)
+                padre = abiertos[-1] if len(abiertos) > 0 else None
+                padre_tag = padre.tag if padre is not None else None
                 
-                # Cargar clientes
-                clientes_xml = config_xml.find('listadoClientes')
-                if clientes_xml is not None:
-                    for cliente_xml in clientes_xml.findall('cliente'):
-                        cliente = self._crear_cliente_desde_xml(cliente_xml, empresa)
+                if elem.tag == 'escritorio' and padre_tag == 'escritoriosActivos':
+                    # Activar escritorios
+                    if punto:
+                        escritorio = self._buscar_escritorio_por_id(punto, MiString(elem.get('idEscritorio')))
+                        if escritorio:
+                            self.activar_escritorio(escritorio)
+                elif elem.tag == 'cliente' and padre_tag == 'listadoClientes':
+                    # Cargar clientes
+                    if punto:
+                        cliente = self._crear_cliente_desde_xml(elem, empresa)
                         punto.clientes_en_espera.agregar(cliente)
+                        punto.indice_cola.invalidar()
+                        punto.espera_en_cola.agregar(cliente.tiempo_espera)
+                        nuevos.agregar(cliente)
+                        procesados += 1
+                        if progreso:
+                            progreso(procesados)
+                elif elem.tag == 'cliente' and padre_tag == 'listadoAtendidos':
+                    # Historial que escribe exportar_estado_xml: no se carga, solo se suelta
+                    pass
+                elif elem.tag == 'configInicial':
+                    # Tickets de todos los clientes del punto en una sola reserva
+                    tickets = self.tickets.reservar(len(nuevos))
+                    for cliente, ticket in zip(nuevos, tickets):
+                        cliente.ticket = ticket
+                    nuevos = ListaEnlazada()
+                    
+                    # Llenar los escritorios activos y calcular las esperas
+                    if punto:
+                        punto.indice_cola.reconstruir()
+                        self._reconstruir_despacho(punto)
+                    empresa = None
+                    punto = None
+                else:
+                    continue
                 
-                # Calcular tiempos de espera y asignar clientes
-                if len(escritorios_activos) > 0:
-                    self._calcular_tiempos_espera(punto, escritorios_activos)
-                    self._asignar_clientes_iniciales(punto, escritorios_activos)
+                # Soltar el elemento ya procesado para liberar su subárbol
+                if padre is not None:
+                    padre.remove(elem)
             
             return True
             
         except Exception as e:
-            messagebox.showerror("Error XML", f"Error al cargar estado inicial:\n{str(e)}")
+            self.ultimo_error = f"Error al cargar estado inicial:\n{str(e)}"
             return False
 
-    def _calcular_tiempos_espera(self, punto, escritorios_activos):
-        """Calcula los tiempos de espera para todos los clientes en el punto"""
-        if punto.clientes_en_espera.longitud == 0:
-            return
-        
-        # Inicializar tiempos acumulados con MiNumero
-        tiempos_acumulados = ListaEnlazada()
-        for _ in range(escritorios_activos.longitud):
-            tiempos_acumulados.agregar(MiNumero(0))
-        
-        # Procesar clientes
-        index = 0
-        actual_cliente = punto.clientes_en_espera.cabeza
-        while actual_cliente is not None:
-            escritorio_idx = index % escritorios_activos.longitud
-            cliente = actual_cliente.dato
-            
-            # Asignar tiempo de espera (asegurando que sea MiNumero)
-            cliente.tiempo_espera = tiempos_acumulados[escritorio_idx]
-            
-            # Calcular tiempo del cliente
-            tiempo_cliente = MiNumero(0)
-            actual_trans = cliente.transacciones.cabeza
-            while actual_trans is not None:
-                tiempo_trans = actual_trans.dato.tiempo
-                if not isinstance(tiempo_trans, MiNumero):
-                    tiempo_trans = MiNumero(tiempo_trans)
-                tiempo_cliente = tiempo_cliente + tiempo_trans
-                actual_trans = actual_trans.siguiente
-            
-            # Actualizar tiempo acumulado
-            tiempos_acumulados[escritorio_idx] = tiempos_acumulados[escritorio_idx] + tiempo_cliente
-            
-            # Siguiente cliente
-            actual_cliente = actual_cliente.siguiente
-            index += 1
+    @staticmethod
+    def _texto_xml(valor):
+        if isinstance(valor, MiString):
+            return valor.a_texto()
+        if isinstance(valor, MiNumero):
+            return str(valor.a_entero())
+        return str(valor)
+
+    def _exportar_xml(self, destino, fragmentos):
+        """Escribe los fragmentos uno a uno en una ruta o en un archivo abierto."""
+        try:
+            if hasattr(destino, 'write'):
+                destino.writelines(fragmentos)
+            else:
+                with open(destino, 'w', encoding='utf-8') as archivo:
+                    archivo.writelines(fragmentos)
+            return True
+        except Exception as e:
+            self.ultimo_error = f"Error al exportar XML: {str(e)}"
+            return False
 
-    def _asignar_clientes_iniciales(self, punto, escritorios_activos):
-        """Asigna los clientes a los escritorios activos"""
-        if not escritorios_activos or punto.clientes_en_espera.longitud == 0:
-            return
-        
-        # Asignar clientes a escritorios en orden round-robin
-        for i in range(punto.clientes_en_espera.longitud):
-            escritorio = escritorios_activos[i % escritorios_activos.longitud]
-            if escritorio.cliente_actual is None:
-                cliente = punto.clientes_en_espera[i]
-                self.asignar_cliente_a_escritorio(escritorio, cliente)
-                
-                # Calcular tiempo restante como MiNumero
-                tiempo_total = MiNumero(0)
-                actual_trans = cliente.transacciones.cabeza
-                while actual_trans is not None:
-                    tiempo_trans = actual_trans.dato.tiempo
-                    if not isinstance(tiempo_trans, MiNumero):
-                        tiempo_trans = MiNumero(tiempo_trans)
-                    tiempo_total = tiempo_total + tiempo_trans
-                    actual_trans = actual_trans.siguiente
-                
-                escritorio.tiempo_restante = tiempo_total
-                
-                # Eliminar cliente de la cola (simulado)
-                punto.clientes_en_espera.pop(i)
-                break
+    def exportar_configuracion_xml(self, destino):
+        """Exporta empresas, puntos, escritorios y transacciones con el esquema
+        que lee cargar_configuracion_xml.
+
+        El XML se genera por fragmentos y se escribe a medida que se produce,
+        sin construir el árbol en memoria. destino es una ruta o un archivo de
+        texto abierto.
+        """
+        return self._exportar_xml(destino, self._fragmentos_configuracion())
+
+    def exportar_estado_xml(self, destino):
+        """Exporta el estado en curso con el esquema configInicial que lee
+        cargar_estado_inicial_xml.
+
+        Por cada punto se escriben sus escritorios activos (en el orden de la
+        pila), los clientes en atención seguidos de la cola en listadoClientes y
+        los clientes ya atendidos en listadoAtendidos, que la carga ignora. Al
+        volver a cargar, los clientes en atención inician de nuevo su servicio.
+        Como exportar_configuracion_xml, escribe por fragmentos con memoria constante.
+        """
+        return self._exportar_xml(destino, self._fragmentos_estado())
+
+    def _fragmentos_configuracion(self):
+        from xml.sax.saxutils import escape, quoteattr
+        texto = self._texto_xml
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n<listaEmpresas>\n'
+        for empresa in self.empresas:
+            yield (f' <empresa id={quoteattr(texto(empresa.id))}>\n'
+                   f'  <nombre>{escape(texto(empresa.nombre))}</nombre>\n'
+                   f'  <abreviatura>{escape(texto(empresa.abreviatura))}</abreviatura>\n'
+                   '  <listaPuntosAtencion>\n')
+            for punto in empresa.puntos_atencion:
+                yield (f'   <puntoAtencion id={quoteattr(texto(punto.id))}>\n'
+                       f'    <nombre>{escape(texto(punto.nombre))}</nombre>\n'
+                       f'    <direccion>{escape(texto(punto.direccion))}</direccion>\n'
+                       '    <listaEscritorios>\n')
+                for escritorio in punto.escritorios:
+                    yield (f'     <escritorio id={quoteattr(texto(escritorio.id))}>\n'
+                           f'      <identificacion>{escape(texto(escritorio.identificacion))}</identificacion>\n'
+                           f'      <encargado>{escape(texto(escritorio.encargado))}</encargado>\n'
+                           '     </escritorio>\n')
+                yield '    </listaEscritorios>\n   </puntoAtencion>\n'
+            yield '  </listaPuntosAtencion>\n  <listaTransacciones>\n'
+            for trans in empresa.transacciones:
+                yield (f'   <transaccion id={quoteattr(texto(trans.id))}>\n'
+                       f'    <nombre>{escape(texto(trans.nombre))}</nombre>\n'
+                       f'    <tiempoAtencion>{texto(trans.tiempo)}</tiempoAtencion>\n'
+                       '   </transaccion>\n')
+            yield '  </listaTransacciones>\n </empresa>\n'
+        yield '</listaEmpresas>\n'
+
+    def _cliente_xml(self, cliente, atributos=''):
+        """Fragmento <cliente> con sus transacciones agrupadas por repeticiones consecutivas."""
+        from xml.sax.saxutils import escape, quoteattr
+        texto = self._texto_xml
+        partes = [f'   <cliente dpi={quoteattr(texto(cliente.dpi))}{atributos}>\n'
+                  f'    <nombre>{escape(texto(cliente.nombre))}</nombre>\n'
+                  '    <listadoTransacciones>\n']
+        anterior = None
+        cantidad = 0
+        for transaccion in cliente.transacciones:
+            if transaccion is anterior:
+                cantidad += 1
+                continue
+            if anterior is not None:
+                partes.append(f'     <transaccion idTransaccion={quoteattr(texto(anterior.id))} cantidad="{cantidad}"/>\n')
+            anterior = transaccion
+            cantidad = 1
+        if anterior is not None:
+            partes.append(f'     <transaccion idTransaccion={quoteattr(texto(anterior.id))} cantidad="{cantidad}"/>\n')
+        partes.append('    </listadoTransacciones>\n   </cliente>\n')
+        return ''.join(partes)
+
+    def _fragmentos_estado(self):
+        from xml.sax.saxutils import quoteattr
+        texto = self._texto_xml
+        
+        # Escritorios activos de cada punto en el orden en que se apilaron
+        activos_por_punto = DiccionarioPersonalizado()
+        for escritorio in self.escritorios_activos:
+            clave = id(escritorio.punto_atencion)
+            if clave not in activos_por_punto:
+                activos_por_punto.agregar(clave, ListaEnlazada())
+            activos_por_punto.obtener(clave).agregar(escritorio)
+        
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n<listaConfigInicial>\n'
+        numero = 0
+        for empresa in self.empresas:
+            for punto in empresa.puntos_atencion:
+                numero += 1
+                yield (f' <configInicial id="{numero}" idEmpresa={quoteattr(texto(empresa.id))} '
+                       f'idPunto={quoteattr(texto(punto.id))}>\n  <escritoriosActivos>\n')
+                clave = id(punto)
+                if clave in activos_por_punto:
+                    for escritorio in activos_por_punto.obtener(clave):
+                        yield f'   <escritorio idEscritorio={quoteattr(texto(escritorio.id))}/>\n'
+                yield '  </escritoriosActivos>\n  <listadoClientes>\n'
+                for escritorio in punto.escritorios:
+                    if escritorio.cliente_actual is not None:
+                        yield self._cliente_xml(escritorio.cliente_actual)
+                for cliente in punto.clientes_en_espera:
+                    yield self._cliente_xml(cliente)
+                yield '  </listadoClientes>\n  <listadoAtendidos>\n'
+                for cliente in punto.clientes_atendidos:
+                    atributos = f' tiempoEspera="{texto(cliente.tiempo_espera)}"'
+                    if cliente.ticket is not None:
+                        atributos = f' ticket={quoteattr(texto(cliente.ticket))}' + atributos
+                    yield self._cliente_xml(cliente, atributos)
+                yield '  </listadoAtendidos>\n </configInicial>\n'
+        yield '</listaConfigInicial>\n'
 
     def generar_reporte_empresa(self, empresa_id):
-        empresa = None
-        for e in self.empresas:
-            if e.id.igual_a(empresa_id):
-                empresa = e
-                break
+        empresa = self._buscar_empresa_por_id(empresa_id)
         if not empresa:
             return None
             
@@ -1353,7 +2703,7 @@ class SistemaAtencion:
         safe_filename = f"reporte_empresa_{empresa.id.a_texto()}"
         safe_filename = ''.join(c for c in safe_filename if c.isalnum() or c in ('_', '-'))
         
-        dot = Digraph(comment=f'Empresa {empresa.nombre.a_texto()}',
+        dot = _nuevo_digraph(comment=f'Empresa {empresa.nombre.a_texto()}',
                     filename=safe_filename)
         dot.attr('graph', rankdir='LR', bgcolor='#f0e6ff')
         
@@ -1422,7 +2772,7 @@ class SistemaAtencion:
         safe_filename = f"reporte_punto_{punto.id.a_texto()}"
         safe_filename = ''.join(c for c in safe_filename if c.isalnum() or c in ('_', '-'))
         
-        dot = Digraph(comment=f'Punto {punto.nombre.a_texto()}',
+        dot = _nuevo_digraph(comment=f'Punto {punto.nombre.a_texto()}',
                     filename=safe_filename)
         dot.attr('graph', bgcolor='#f0e6ff')
         
@@ -1444,11 +2794,14 @@ class SistemaAtencion:
     • Promedio: {stats_punto["promedio_espera"]:.1f} min
     • Máximo: {stats_punto["max_espera"]} min
     • Mínimo: {stats_punto["min_espera"]} min
+    • P50 / P90 / P99: {stats_punto["p50_espera"]:.1f} / {stats_punto["p90_espera"]:.1f} / {stats_punto["p99_espera"]:.1f} min
+    • En cola: {stats_punto["clientes_en_cola"]} clientes, espera proyectada prom. {stats_punto["promedio_espera_cola"]:.1f} min
 
     <B>Tiempos de atención:</B>
     • Promedio: {stats_punto["promedio_atencion"]:.1f} min
     • Máximo: {stats_punto["max_atencion"]} min
-    • Mínimo: {stats_punto["min_atencion"]} min>'''
+    • Mínimo: {stats_punto["min_atencion"]} min
+    • P50 / P90 / P99: {stats_punto["p50_atencion"]:.1f} / {stats_punto["p90_atencion"]:.1f} / {stats_punto["p99_atencion"]:.1f} min>'''
         
         dot.node('header', header_text,
                 shape='box', style='filled', fillcolor='#b399d4', fontcolor='white')
@@ -1470,7 +2823,8 @@ class SistemaAtencion:
     <B>Tiempos de atención:</B>
     • Promedio: {stats_esc["promedio_atencion"]:.1f} min
     • Máximo: {stats_esc["max_atencion"]} min
-    • Mínimo: {stats_esc["min_atencion"]} min>'''
+    • Mínimo: {stats_esc["min_atencion"]} min
+    • P50 / P90 / P99: {stats_esc["p50_atencion"]:.1f} / {stats_esc["p90_atencion"]:.1f} / {stats_esc["p99_atencion"]:.1f} min>'''
                 
                 esc_id = f'e{escritorio.id.a_texto()}'
                 dot.node(esc_id, esc_text,
@@ -1480,22 +2834,460 @@ class SistemaAtencion:
 
     def _buscar_punto(self, punto_id):
         """Busca un punto de atención por ID y devuelve el punto y su empresa"""
-        for empresa in self.empresas:
-            for punto in empresa.puntos_atencion:
-                if punto.id.igual_a(punto_id):
-                    return punto, empresa
+        if punto_id in self.indice_puntos:
+            par = self.indice_puntos.obtener(punto_id)
+            return par.clave, par.valor
         return None, None
     
     def limpiar_sistema(self):
         """Limpia todos los datos del sistema"""
         self.empresas = ListaEnlazada()
-        self.tickets_generados = ConjuntoPersonalizado()
+        self.indice_empresas = DiccionarioPersonalizado()
+        self.indice_puntos = DiccionarioPersonalizado()
+        self.tickets = GeneradorTickets()
         self.tiempo_simulado = 0
         self.escritorios_activos = ListaEnlazada()
+        self.puntos_ocupados = ConjuntoIndexado()
+        self.puntos_con_cola = ConjuntoIndexado()
+        self.ubicacion_tickets = DiccionarioPersonalizado()
+
+    def guardar_instantanea(self, ruta):
+        """Guarda todo el estado del sistema en un archivo binario (ver EscritorInstantanea)."""
+        EscritorInstantanea(self).guardar(ruta)
+
+    def cargar_instantanea(self, ruta):
+        """Reemplaza el estado del sistema por el de una instantánea binaria.
+
+        Retorna False y deja el mensaje en ultimo_error si no se pudo cargar;
+        en ese caso el estado anterior queda intacto.
+        """
+        try:
+            restaurado = LectorInstantanea(ruta).leer()
+        except Exception as e:
+            self.ultimo_error = f"Error al cargar instantánea: {str(e)}"
+            return False
+        self.empresas = restaurado.empresas
+        self.indice_empresas = restaurado.indice_empresas
+        self.indice_puntos = restaurado.indice_puntos
+        self.tickets = restaurado.tickets
+        self.tiempo_simulado = restaurado.tiempo_simulado
+        self.escritorios_activos = restaurado.escritorios_activos
+        self.puntos_ocupados = restaurado.puntos_ocupados
+        self.puntos_con_cola = restaurado.puntos_con_cola
+        self.ubicacion_tickets = restaurado.ubicacion_tickets
+        return True
+
+# ==================== INSTANTÁNEAS BINARIAS ====================
+
+class EscritorInstantanea:
+    """Serializa un SistemaAtencion a un formato binario compacto.
+
+    El archivo es una cabecera seguida de bloques contiguos: tres flujos de
+    enteros (transacciones, clientes y estructura), uno de reales,
+    los puntos de código de todos los MiString, los textos nativos en UTF-8
+    con sus desplazamientos y los mapas de bits del registro de tickets. Los
+    objetos compartidos (transacciones, clientes) se escriben una vez y se
+    referencian por posición. Cada bloque de enteros se guarda con el tipo más
+    angosto que admite sus valores; la cabecera registra los tipos usados.
+    """
+    MAGIA = b'SATI'
+    VERSION = 1
+    # Etiquetas de los valores escalares: (etiqueta, a, b)
+    NULO, CADENA, TEXTO, ENTERO, NUMERO, REAL = range(6)
+
+    def __init__(self, sistema):
+        from array import array
+        self.sistema = sistema
+        self.transacciones = array('q')
+        self.clientes = array('q')
+        self.estructura = array('q')
+        self.reales = array('d')
+        self.codigos = array('I')
+        self.textos = bytearray()
+        self.desplazamientos = array('q', [0])
+        self.posicion_transaccion = DiccionarioPersonalizado()
+        self.posicion_cliente = DiccionarioPersonalizado()
+        self.cantidad_transacciones = 0
+        self.cantidad_clientes = 0
+
+    def _valor(self, flujo, valor):
+        if valor is None:
+            flujo.extend((self.NULO, 0, 0))
+        elif isinstance(valor, MiString):
+            flujo.extend((self.CADENA, len(self.codigos), len(valor.codigos)))
+            self.codigos.extend(valor.codigos)
+        elif isinstance(valor, str):
+            self.textos += valor.encode('utf-8')
+            self.desplazamientos.append(len(self.textos))
+            flujo.extend((self.TEXTO, len(self.desplazamientos) - 2, 0))
+        elif isinstance(valor, MiNumero):
+            flujo.extend((self.NUMERO, valor.valor, 0))
+        elif isinstance(valor, int):
+            flujo.extend((self.ENTERO, valor, 0))
+        elif isinstance(valor, float):
+            self.reales.append(valor)
+            flujo.extend((self.REAL, len(self.reales) - 1, 0))
+        else:
+            raise TypeError(f"No se puede guardar un valor de tipo {type(valor).__name__}")
+
+    def _transaccion(self, transaccion):
+        clave = id(transaccion)
+        try:
+            return self.posicion_transaccion.obtener(clave)
+        except KeyError:
+            pass
+        posicion = self.cantidad_transacciones
+        self.posicion_transaccion.agregar(clave, posicion)
+        self.cantidad_transacciones += 1
+        self._valor(self.transacciones, transaccion.id)
+        self._valor(self.transacciones, transaccion.nombre)
+        self._valor(self.transacciones, transaccion.tiempo)
+        return posicion
+
+    def _cliente(self, cliente):
+        if cliente is None:
+            return -1
+        clave = id(cliente)
+        try:
+            return self.posicion_cliente.obtener(clave)
+        except KeyError:
+            pass
+        posicion = self.cantidad_clientes
+        self.posicion_cliente.agregar(clave, posicion)
+        self.cantidad_clientes += 1
+        flujo = self.clientes
+        self._valor(flujo, cliente.dpi)
+        self._valor(flujo, cliente.nombre)
+        self._valor(flujo, cliente.ticket)
+        self._valor(flujo, cliente.tiempo_espera)
+        self._valor(flujo, cliente.llegada)
+        posiciones = [self._transaccion(t) for t in cliente.transacciones]
+        flujo.append(cliente.tiempo_atencion)
+        flujo.append(len(posiciones))
+        flujo.extend(posiciones)
+        return posicion
+
+    def _lista_clientes(self, lista):
+        self.estructura.append(len(lista))
+        self.estructura.extend([self._cliente(cliente) for cliente in lista])
+
+    def _estadistica(self, estadistica):
+        flujo = self.estructura
+        flujo.append(estadistica.cantidad)
+        self._valor(flujo, estadistica.suma)
+        self._valor(flujo, estadistica.minimo)
+        self._valor(flujo, estadistica.maximo)
+        bosquejo = estadistica.cuantiles
+        flujo.append(len(self.reales))
+        self.reales.extend((estadistica._media, estadistica._m2, bosquejo.precision))
+        flujo.extend((bosquejo.max_cubetas, bosquejo.desplazamiento, bosquejo.ceros, bosquejo.cantidad))
+        self._valor(flujo, bosquejo.minimo)
+        self._valor(flujo, bosquejo.maximo)
+        flujo.append(len(bosquejo.conteos))
+        flujo.extend(bosquejo.conteos)
+
+    @staticmethod
+    def _compactar(bloque):
+        """Copia un bloque de enteros al tipo más angosto que admite todos sus valores."""
+        from array import array
+        if bloque.typecode == 'd' or not bloque:
+            return bloque
+        menor, mayor = min(bloque), max(bloque)
+        for tipo, minimo, maximo in (('B', 0, 0xFF), ('H', 0, 0xFFFF), ('i', -2**31, 2**31 - 1)):
+            if minimo <= menor and mayor <= maximo:
+                return array(tipo, bloque)
+        return bloque
+
+    def guardar(self, ruta):
+        import struct
+        sistema = self.sistema
+        flujo = self.estructura
+        self._valor(flujo, sistema.tiempo_simulado)
+        
+        # Registro de tickets
+        generador = sistema.tickets
+        registro = generador.registro
+        flujo.extend((generador.a, generador.b, generador.contador, registro.tamano,
+                      registro.dias_retencion, len(registro.dias)))
+        mapas = bytearray()
+        for dia in registro.dias:
+            flujo.append(dia.valor)
+            mapas += dia.clave
+        
+        # Empresas, puntos y escritorios; los escritorios se numeran en orden
+        posicion_escritorio = DiccionarioPersonalizado()
+        flujo.append(len(sistema.empresas))
+        for empresa in sistema.empresas:
+            self._valor(flujo, empresa.id)
+            self._valor(flujo, empresa.nombre)
+            self._valor(flujo, empresa.abreviatura)
+            flujo.append(len(empresa.transacciones))
+            flujo.extend([self._transaccion(t) for t in empresa.transacciones])
+            flujo.append(len(empresa.puntos_atencion))
+            for punto in empresa.puntos_atencion:
+                self._valor(flujo, punto.id)
+                self._valor(flujo, punto.nombre)
+                self._valor(flujo, punto.direccion)
+                flujo.append(punto.total_activos)
+                flujo.append(len(punto.escritorios))
+                for escritorio in punto.escritorios:
+                    posicion_escritorio.agregar(id(escritorio), len(posicion_escritorio))
+                    self._valor(flujo, escritorio.id)
+                    self._valor(flujo, escritorio.identificacion)
+                    self._valor(flujo, escritorio.encargado)
+                    flujo.append(1 if escritorio.activo else 0)
+                    self._valor(flujo, escritorio.tiempo_restante)
+                    flujo.append(self._cliente(escritorio.cliente_actual))
+                self._lista_clientes(punto.clientes_en_espera)
+                self._lista_clientes(punto.clientes_atendidos)
+                self._estadistica(punto.estadistica_espera)
+                self._estadistica(punto.estadistica_atencion)
+                for escritorio in punto.escritorios:
+                    self._lista_clientes(escritorio.clientes_atendidos)
+                    self._estadistica(escritorio.estadistica_atencion)
+                flujo.extend((1 if punto.despacho_vigente else 0, len(punto.despacho)))
+                for libre, orden in punto.despacho.claves:
+                    flujo.extend((libre, orden))
+        
+        # Pila de escritorios activos, de la base al tope
+        flujo.append(len(sistema.escritorios_activos))
+        for escritorio in sistema.escritorios_activos:
+            flujo.append(posicion_escritorio.obtener(id(escritorio)))
+        
+        bloques = [self._compactar(bloque) for bloque in (
+            self.transacciones, self.clientes, self.estructura, self.reales,
+            self.codigos, self.desplazamientos)]
+        cabecera = struct.pack('<4sHB6s', self.MAGIA, self.VERSION, 1 if sys.byteorder == 'little' else 0,
+                               ''.join(bloque.typecode for bloque in bloques).encode('ascii'))
+        cabecera += struct.pack('<' + 'Q' * 10, self.cantidad_transacciones, self.cantidad_clientes,
+                                *[len(bloque) for bloque in bloques], len(self.textos), len(mapas))
+        with open(ruta, 'wb') as archivo:
+            archivo.write(cabecera)
+            for bloque in bloques:
+                archivo.write(bloque.tobytes())
+            archivo.write(self.textos)
+            archivo.write(mapas)
+
+class LectorInstantanea:
+    """Reconstruye un SistemaAtencion desde un archivo de EscritorInstantanea.
+
+    El archivo se mapea en memoria y cada bloque se convierte de una vez; los
+    objetos se crean recorriendo los flujos de enteros con un cursor.
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+
+    def _valor(self, flujo, i):
+        """Retorna (valor, siguiente posición) del escalar que empieza en i."""
+        etiqueta = flujo[i]
+        if etiqueta == EscritorInstantanea.CADENA:
+            inicio = flujo[i + 1]
+            valor = MiString.desde_codigos(tuple(self.codigos[inicio:inicio + flujo[i + 2]]))
+        elif etiqueta == EscritorInstantanea.ENTERO:
+            valor = flujo[i + 1]
+        elif etiqueta == EscritorInstantanea.NUMERO:
+            valor = MiNumero(flujo[i + 1])
+        elif etiqueta == EscritorInstantanea.TEXTO:
+            j = flujo[i + 1]
+            valor = self.textos[self.desplazamientos[j]:self.desplazamientos[j + 1]].decode('utf-8')
+        elif etiqueta == EscritorInstantanea.REAL:
+            valor = self.reales[flujo[i + 1]]
+        else:
+            valor = None
+        return valor, i + 3
+
+    def _estadistica(self, flujo, i):
+        estadistica = EstadisticaAcumulada()
+        estadistica.cantidad = flujo[i]
+        estadistica.suma, i = self._valor(flujo, i + 1)
+        estadistica.minimo, i = self._valor(flujo, i)
+        estadistica.maximo, i = self._valor(flujo, i)
+        real = flujo[i]
+        estadistica._media = self.reales[real]
+        estadistica._m2 = self.reales[real + 1]
+        bosquejo = BosquejoCuantiles(self.reales[real + 2], flujo[i + 1])
+        i += 1
+        bosquejo.desplazamiento, bosquejo.ceros, bosquejo.cantidad = flujo[i + 1:i + 4]
+        bosquejo.minimo, i = self._valor(flujo, i + 4)
+        bosquejo.maximo, i = self._valor(flujo, i)
+        cantidad = flujo[i]
+        bosquejo.conteos = flujo[i + 1:i + 1 + cantidad]
+        estadistica.cuantiles = bosquejo
+        return estadistica, i + 1 + cantidad
+
+    def _lista_clientes(self, flujo, i):
+        lista = ListaDoblementeEnlazada()
+        cantidad = flujo[i]
+        clientes = self.clientes
+        for posicion in flujo[i + 1:i + 1 + cantidad]:
+            lista.agregar(clientes[posicion])
+        return lista, i + 1 + cantidad
+
+    def leer(self):
+        import mmap
+        import struct
+        from array import array
+        
+        with open(self.ruta, 'rb') as archivo:
+            with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                vista = memoryview(mapa)
+                try:
+                    posicion = 13 + 8 * 10
+                    if len(mapa) < posicion:
+                        raise ValueError("El archivo no es una instantánea compatible")
+                    magia, version, little, tipos = struct.unpack_from('<4sHB6s', vista, 0)
+                    if magia != EscritorInstantanea.MAGIA or version != EscritorInstantanea.VERSION:
+                        raise ValueError("El archivo no es una instantánea compatible")
+                    medidas = struct.unpack_from('<' + 'Q' * 10, vista, 13)
+                    n_transacciones, n_clientes = medidas[:2]
+                    
+                    # Los bloques que declara la cabecera deben ocupar el archivo exacto
+                    tipos = tipos.decode('ascii')
+                    esperado = posicion + medidas[8] + medidas[9]
+                    for tipo, cantidad in zip(tipos, medidas[2:8]):
+                        esperado += cantidad * array(tipo).itemsize
+                    if esperado != len(mapa):
+                        raise ValueError(f"Instantánea truncada o dañada: la cabecera declara "
+                                         f"{esperado} bytes y el archivo tiene {len(mapa)}")
+                    
+                    bloques = []
+                    for tipo, cantidad in zip(tipos, medidas[2:8]):
+                        bloque = array(tipo)
+                        bloque.frombytes(vista[posicion:posicion + cantidad * bloque.itemsize])
+                        if little != (sys.byteorder == 'little'):
+                            bloque.byteswap()
+                        posicion += cantidad * bloque.itemsize
+                        bloques.append(bloque.tolist())
+                    self.textos = bytes(vista[posicion:posicion + medidas[8]])
+                    posicion += medidas[8]
+                    mapas = bytes(vista[posicion:posicion + medidas[9]])
+                finally:
+                    vista.release()
+        
+        # Se crean cientos de miles de objetos sin ciclos: el recolector solo estorba
+        recolector_activo = gc.isenabled()
+        gc.disable()
+        try:
+            return self._construir(n_transacciones, n_clientes, bloques, mapas)
+        finally:
+            if recolector_activo:
+                gc.enable()
+
+    def _construir(self, n_transacciones, n_clientes, bloques, mapas):
+        flujo_transacciones, flujo_clientes, flujo, self.reales, self.codigos, self.desplazamientos = bloques
+        
+        transacciones = []
+        i = 0
+        for _ in range(n_transacciones):
+            id_transaccion, i = self._valor(flujo_transacciones, i)
+            nombre, i = self._valor(flujo_transacciones, i)
+            tiempo, i = self._valor(flujo_transacciones, i)
+            transacciones.append(Transaccion(id_transaccion, nombre, tiempo))
+        
+        self.clientes = []
+        i = 0
+        valor = self._valor
+        for _ in range(n_clientes):
+            dpi, i = valor(flujo_clientes, i)
+            nombre, i = valor(flujo_clientes, i)
+            cliente = Cliente(dpi, nombre)
+            cliente.ticket, i = valor(flujo_clientes, i)
+            cliente.tiempo_espera, i = valor(flujo_clientes, i)
+            cliente.llegada, i = valor(flujo_clientes, i)
+            tiempo_atencion = flujo_clientes[i]
+            cantidad = flujo_clientes[i + 1]
+            cliente.transacciones.agregar_varios(
+                [transacciones[posicion] for posicion in flujo_clientes[i + 2:i + 2 + cantidad]])
+            cliente._tiempo_atencion = tiempo_atencion
+            cliente._transacciones_sumadas = cantidad
+            i += 2 + cantidad
+            self.clientes.append(cliente)
+        
+        sistema = SistemaAtencion()
+        sistema.tiempo_simulado, i = self._valor(flujo, 0)
+        
+        a, b, contador, tamano, dias_retencion, n_dias = flujo[i:i + 6]
+        i += 6
+        generador = GeneradorTickets(dias_retencion=dias_retencion)
+        generador.a, generador.b, generador.contador = a, b, contador
+        registro = generador.registro
+        registro.dias = ListaEnlazada()
+        registro.total = 0
+        bytes_por_dia = (tamano + 7) // 8
+        if len(mapas) != n_dias * bytes_por_dia:
+            raise ValueError("Instantánea dañada: los mapas de tickets no tienen el tamaño del registro")
+        for d in range(n_dias):
+            registro.dias.agregar(Par(bytearray(mapas[d * bytes_por_dia:(d + 1) * bytes_por_dia]), flujo[i]))
+            registro.total += flujo[i]
+            i += 1
+        sistema.tickets = generador
+        
+        escritorios = []
+        n_empresas = flujo[i]
+        i += 1
+        for _ in range(n_empresas):
+            id_empresa, i = self._valor(flujo, i)
+            nombre, i = self._valor(flujo, i)
+            abreviatura, i = self._valor(flujo, i)
+            empresa = Empresa(id_empresa, nombre, abreviatura)
+            cantidad = flujo[i]
+            for posicion in flujo[i + 1:i + 1 + cantidad]:
+                empresa.transacciones.agregar(transacciones[posicion])
+            i += 1 + cantidad
+            n_puntos = flujo[i]
+            i += 1
+            for _ in range(n_puntos):
+                id_punto, i = self._valor(flujo, i)
+                nombre, i = self._valor(flujo, i)
+                direccion, i = self._valor(flujo, i)
+                punto = PuntoAtencion(id_punto, nombre, direccion)
+                punto.total_activos = flujo[i]
+                n_escritorios = flujo[i + 1]
+                i += 2
+                for _ in range(n_escritorios):
+                    id_escritorio, i = self._valor(flujo, i)
+                    identificacion, i = self._valor(flujo, i)
+                    encargado, i = self._valor(flujo, i)
+                    escritorio = EscritorioServicio(id_escritorio, identificacion, encargado)
+                    escritorio.activo = flujo[i] == 1
+                    escritorio.tiempo_restante, i = self._valor(flujo, i + 1)
+                    escritorio.cliente_actual = self.clientes[flujo[i]] if flujo[i] >= 0 else None
+                    i += 1
+                    punto.escritorios.agregar(escritorio)
+                    escritorios.append(escritorio)
+                punto.clientes_en_espera, i = self._lista_clientes(flujo, i)
+                punto.indice_cola = IndiceCola(punto.clientes_en_espera)
+                for cliente in punto.clientes_en_espera:
+                    punto.espera_en_cola.agregar(cliente.tiempo_espera)
+                punto.clientes_atendidos, i = self._lista_clientes(flujo, i)
+                punto.estadistica_espera, i = self._estadistica(flujo, i)
+                punto.estadistica_atencion, i = self._estadistica(flujo, i)
+                for escritorio in punto.escritorios:
+                    escritorio.clientes_atendidos, i = self._lista_clientes(flujo, i)
+                    escritorio.estadistica_atencion, i = self._estadistica(flujo, i)
+                punto.despacho_vigente = flujo[i] == 1
+                propios = list(punto.escritorios)
+                for _ in range(flujo[i + 1]):
+                    libre, orden = flujo[i + 2], flujo[i + 3]
+                    punto.despacho.claves.append((libre, orden))
+                    punto.despacho.datos.append(propios[orden])
+                    i += 2
+                i += 2
+                empresa.puntos_atencion.agregar(punto)
+            sistema.agregar_empresa(empresa)
+        
+        cantidad = flujo[i]
+        for posicion in flujo[i + 1:i + 1 + cantidad]:
+            sistema.escritorios_activos.agregar(escritorios[posicion])
+        for empresa in sistema.empresas:
+            for punto in empresa.puntos_atencion:
+                sistema._actualizar_actividad(punto)
+        return sistema
 
 # ==================== INTERFAZ GRÁFICA ====================
 class MobileAppSimulator:
     def __init__(self, root):
+        _importar_interfaz()
         self.root = root
         self.root.title("Sistema de Atención a Clientes")
         self.root.geometry("360x640")
@@ -1562,6 +3354,7 @@ class MobileAppSimulator:
         sim_menu = tk.Menu(menubar, tearoff=0)
         sim_menu.add_command(label="Simular 5 minutos", command=lambda: self._simular_tiempo(5))
         sim_menu.add_command(label="Simular 15 minutos", command=lambda: self._simular_tiempo(15))
+        sim_menu.add_command(label="Simular 1 hora", command=lambda: self._simular_tiempo(60))
         
         # Menú Ayuda
         help_menu = tk.Menu(menubar, tearoff=0)
@@ -1614,20 +3407,12 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
                 messagebox.showerror("Error", "Todos los campos son obligatorios")
                 return
                 
-            # Verificar si la empresa ya existe
-            empresa_existente = None
-            for e in self.sistema.empresas:
-                if e.id == id_empresa:
-                    empresa_existente = e
-                    break
-                    
-            if empresa_existente:
+            # Crear nueva empresa (el sistema rechaza IDs repetidos)
+            nueva_empresa = Empresa(MiString(id_empresa), MiString(nombre), MiString(abreviatura))
+            if not self.sistema.agregar_empresa(nueva_empresa):
                 messagebox.showerror("Error", f"Ya existe una empresa con ID {id_empresa}")
                 return
                 
-            # Crear nueva empresa
-            nueva_empresa = Empresa(id_empresa, nombre, abreviatura)
-            self.sistema.empresas.agregar(nueva_empresa)
             messagebox.showinfo("Éxito", "Empresa creada correctamente")
             self._update_ui_after_load()
             dialog.destroy()
@@ -1650,7 +3435,7 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
         empresa_var = tk.StringVar()
         empresas = ListaEnlazada()
         for emp in self.sistema.empresas:
-            empresas.agregar(emp.nombre)
+            empresas.agregar(emp.nombre.a_texto())
             
         valores = []
         actual = empresas.cabeza
@@ -1686,7 +3471,7 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
             # Buscar la empresa seleccionada
             empresa = None
             for e in self.sistema.empresas:
-                if e.nombre == empresa_nombre:
+                if e.nombre.a_texto() == empresa_nombre:
                     empresa = e
                     break
                     
@@ -1694,20 +3479,12 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
                 messagebox.showerror("Error", "Empresa no encontrada")
                 return
                 
-            # Verificar si el punto ya existe
-            punto_existente = None
-            for p in empresa.puntos_atencion:
-                if p.id == id_punto:
-                    punto_existente = p
-                    break
-                    
-            if punto_existente:
+            # Crear nuevo punto (el sistema rechaza IDs repetidos en la empresa)
+            nuevo_punto = PuntoAtencion(MiString(id_punto), MiString(nombre), MiString(direccion))
+            if not self.sistema.agregar_punto(empresa, nuevo_punto):
                 messagebox.showerror("Error", f"Ya existe un punto con ID {id_punto} en esta empresa")
                 return
                 
-            # Crear nuevo punto
-            nuevo_punto = PuntoAtencion(id_punto, nombre, direccion)
-            empresa.puntos_atencion.agregar(nuevo_punto)
             messagebox.showinfo("Éxito", "Punto de atención creado correctamente")
             self._update_ui_after_load()
             dialog.destroy()
@@ -1730,7 +3507,7 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
         empresa_var = tk.StringVar()
         empresas = ListaEnlazada()
         for emp in self.sistema.empresas:
-            empresas.agregar(emp.nombre)
+            empresas.agregar(emp.nombre.a_texto())
             
         empresa_combobox = ttk.Combobox(dialog, textvariable=empresa_var, values=list(empresas), state="readonly")
         empresa_combobox.pack(pady=5)
@@ -1742,7 +3519,7 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
         self.punto_var = tk.StringVar()
         self.punto_combobox = ttk.Combobox(dialog, textvariable=self.punto_var, state="readonly")
         self.punto_combobox.pack(pady=5)
-        self._actualizar_puntos_combobox(dialog, self.sistema.empresas[0].nombre if len(self.sistema.empresas) > 0 else "")
+        self._actualizar_puntos_combobox(dialog, self.sistema.empresas[0].nombre.a_texto() if len(self.sistema.empresas) > 0 else "")
         
         tk.Label(dialog, text="ID del Escritorio:").pack()
         id_entry = tk.Entry(dialog)
@@ -1770,7 +3547,7 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
             # Buscar la empresa y punto seleccionados
             empresa = None
             for e in self.sistema.empresas:
-                if e.nombre == empresa_nombre:
+                if e.nombre.a_texto() == empresa_nombre:
                     empresa = e
                     break
                     
@@ -1780,7 +3557,7 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
                 
             punto = None
             for p in empresa.puntos_atencion:
-                if p.nombre == punto_nombre:
+                if p.nombre.a_texto() == punto_nombre:
                     punto = p
                     break
                     
@@ -1788,21 +3565,12 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
                 messagebox.showerror("Error", "Punto de atención no encontrado")
                 return
                 
-            # Verificar si el escritorio ya existe
-            escritorio_existente = None
-            for e in punto.escritorios:
-                if e.id == id_escritorio:
-                    escritorio_existente = e
-                    break
-                    
-            if escritorio_existente:
+            # Crear nuevo escritorio (el sistema rechaza IDs repetidos en el punto)
+            nuevo_escritorio = EscritorioServicio(MiString(id_escritorio), MiString(identificacion), MiString(encargado))
+            if not self.sistema.agregar_escritorio(punto, nuevo_escritorio):
                 messagebox.showerror("Error", f"Ya existe un escritorio con ID {id_escritorio} en este punto")
                 return
                 
-            # Crear nuevo escritorio
-            nuevo_escritorio = EscritorioServicio(id_escritorio, identificacion, encargado)
-            nuevo_escritorio.punto_atencion = punto
-            punto.escritorios.agregar(nuevo_escritorio)
             messagebox.showinfo("Éxito", "Escritorio creado correctamente")
             self._update_ui_after_load()
             dialog.destroy()
@@ -1812,14 +3580,14 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
     def _actualizar_puntos_combobox(self, dialog, empresa_nombre):
         empresa = None
         for e in self.sistema.empresas:
-            if e.nombre == empresa_nombre:
+            if e.nombre.a_texto() == empresa_nombre:
                 empresa = e
                 break
                 
         if empresa:
             puntos = ListaEnlazada()
             for p in empresa.puntos_atencion:
-                puntos.agregar(p.nombre)
+                puntos.agregar(p.nombre.a_texto())
                 
             self.punto_combobox['values'] = list(puntos)
             if len(puntos) > 0:
@@ -1873,60 +3641,28 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
         )
         
         if filepath:
-            try:
-                # Crear estructura XML
-                root = ET.Element("listaEmpresas")
-                
-                for empresa in self.sistema.empresas:
-                    empresa_elem = ET.SubElement(root, "empresa", id=empresa.id)
-                    
-                    ET.SubElement(empresa_elem, "nombre").text = empresa.nombre
-                    ET.SubElement(empresa_elem, "abreviatura").text = empresa.abreviatura
-                    
-                    # Puntos de atención
-                    puntos_elem = ET.SubElement(empresa_elem, "listaPuntosAtencion")
-                    for punto in empresa.puntos_atencion:
-                        punto_elem = ET.SubElement(puntos_elem, "puntoAtencion", id=punto.id)
-                        ET.SubElement(punto_elem, "nombre").text = punto.nombre
-                        ET.SubElement(punto_elem, "direccion").text = punto.direccion
-                        
-                        # Escritorios
-                        escritorios_elem = ET.SubElement(punto_elem, "listaEscritorios")
-                        for escritorio in punto.escritorios:
-                            esc_elem = ET.SubElement(escritorios_elem, "escritorio", id=escritorio.id)
-                            ET.SubElement(esc_elem, "identificacion").text = escritorio.identificacion
-                            ET.SubElement(esc_elem, "encargado").text = escritorio.encargado
-                    
-                    # Transacciones
-                    transacciones_elem = ET.SubElement(empresa_elem, "listaTransacciones")
-                    for trans in empresa.transacciones:
-                        trans_elem = ET.SubElement(transacciones_elem, "transaccion", id=trans.id)
-                        ET.SubElement(trans_elem, "nombre").text = trans.nombre
-                        ET.SubElement(trans_elem, "tiempoAtencion").text = str(trans.tiempo)
-                
-                # Guardar XML
-                tree = ET.ElementTree(root)
-                tree.write(filepath, encoding='utf-8', xml_declaration=True)
-                messagebox.showinfo("Éxito", f"Configuración guardada en:\n{filepath}")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"No se pudo guardar la configuración:\n{str(e)}")
+            if not self.sistema.exportar_configuracion_xml(filepath):
+                messagebox.showerror("Error", f"No se pudo guardar la configuración:\n{self.sistema.ultimo_error}")
+                return
+            mensaje = f"Configuración guardada en:\n{filepath}"
+            
+            # Ofrecer guardar también colas, escritorios activos y atendidos
+            if messagebox.askyesno("Estado", "¿Desea guardar también el estado actual de la simulación?"):
+                ruta_estado = filedialog.asksaveasfilename(
+                    defaultextension=".xml",
+                    filetypes=[("XML files", "*.xml"), ("All files", "*.*")]
+                )
+                if ruta_estado:
+                    if not self.sistema.exportar_estado_xml(ruta_estado):
+                        messagebox.showerror("Error", f"No se pudo guardar el estado:\n{self.sistema.ultimo_error}")
+                        return
+                    mensaje += f"\nEstado guardado en:\n{ruta_estado}"
+            messagebox.showinfo("Éxito", mensaje)
 
     def _simular_tiempo(self, minutos):
         try:
             # Verificar si hay algo que simular
-            hay_que_simular = False
-            for empresa in self.sistema.empresas:
-                for punto in empresa.puntos_atencion:
-                    if punto.clientes_en_espera.longitud > 0:
-                        hay_que_simular = True
-                        break
-                    for escritorio in punto.escritorios:
-                        if escritorio.activo and escritorio.cliente_actual:
-                            hay_que_simular = True
-                            break
-            
-            if not hay_que_simular:
+            if not self.sistema.hay_actividad():
                 messagebox.showinfo("Información", "No hay clientes en espera o escritorios activos para simular")
                 return
                 
@@ -1973,7 +3709,7 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
             messagebox.showwarning("Advertencia", "No hay datos cargados")
             return
             
-        dot = Digraph(comment='Colas de Espera')
+        dot = _nuevo_digraph(comment='Colas de Espera')
         dot.attr('graph', rankdir='TB', bgcolor='#f0e6ff')
         
         for empresa in self.sistema.empresas:
@@ -2020,15 +3756,9 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
                                     
                                     trans_text = "\n".join(transacciones)
                                     
-                                    # Calcular tiempo de espera acumulado
-                                    tiempo_espera = 0
-                                    temp_cliente = punto.clientes_en_espera.cabeza
-                                    j = 0
-                                    while j < i and temp_cliente is not None:
-                                        tiempo_cliente = temp_cliente.dato.tiempo_espera.a_entero() if hasattr(temp_cliente.dato.tiempo_espera, 'a_entero') else temp_cliente.dato.tiempo_espera
-                                        tiempo_espera += tiempo_cliente
-                                        temp_cliente = temp_cliente.siguiente
-                                        j += 1
+                                    # Espera calculada por el despachador del punto
+                                    tiempo_espera = cliente.tiempo_espera
+                                    tiempo_espera = tiempo_espera.a_entero() if hasattr(tiempo_espera, 'a_entero') else tiempo_espera
                                     
                                     cola.node(f'cli_{punto.id.a_texto()}_{i}',
                                             f'<<B>Cliente {i+1}:</B> {cliente.nombre.a_texto()}\n'
@@ -2048,6 +3778,7 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
         try:
             # Crear nombre de archivo seguro
             safe_filename = ''.join(c for c in filename if c.isalnum() or c in ('_', '-'))
+            import tempfile
             temp_dir = tempfile.mkdtemp()
             filepath = os.path.join(temp_dir, safe_filename)
             
@@ -2118,6 +3849,8 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
             if self.sistema.cargar_estado_inicial_xml(filepath):
                 messagebox.showinfo("Éxito", "Estado inicial cargado correctamente")
                 self._update_ui_after_load()
+            else:
+                messagebox.showerror("Error XML", self.sistema.ultimo_error)
     
     def _update_ui_after_load(self):
         # Limpiar comboboxes
@@ -2474,7 +4207,7 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
             
             # Asignar transacciones seleccionadas
             for trans in selected_trans:
-                cliente.transacciones.agregar(trans)
+                cliente.agregar_transaccion(trans)
                 
             # Procesar la solicitud
             ticket, wait_time, service_time = self.sistema.asignar_cliente(punto, cliente)
@@ -2526,7 +4259,7 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
         """Procesa la solicitud del cliente en el punto especificado"""
         cliente = Cliente("123456789", "Cliente Ejemplo")  # Datos de ejemplo
         for trans in transactions:
-            cliente.transacciones.agregar(trans)
+            cliente.agregar_transaccion(trans)
         
         return self.sistema.asignar_cliente(punto, cliente)
     
@@ -2588,7 +4321,113 @@ Enlace a la documentación: https://github.com/MarioRene/IPC2_Proyecto2_20211113
             command=ticket_window.destroy
         ).pack(pady=20, fill=tk.X)
 
+# ==================== LÍNEA DE COMANDOS ====================
+
+def _stats_para_json(stats):
+    return {clave: (valor.a_entero() if hasattr(valor, 'a_entero') else valor)
+            for clave, valor in stats.items()}
+
+def simular_lote(config, estado, salida, dir_graphviz=None):
+    """Carga ambos XML, simula todos los puntos y escribe un reporte JSON.
+
+    Las fuentes Graphviz de cada empresa y punto se escriben en dir_graphviz
+    si se indica; si no, van dentro del JSON. Sin el paquete graphviz el JSON
+    se escribe igual (con "graphviz": null) y se retorna 2. Retorna el código
+    de salida.
+    """
+    import json
+    
+    sistema = SistemaAtencion()
+    if not sistema.cargar_configuracion_xml(config):
+        print(sistema.ultimo_error or "No se cargaron empresas del archivo", file=sys.stderr)
+        return 1
+    if not sistema.cargar_estado_inicial_xml(estado):
+        print(sistema.ultimo_error, file=sys.stderr)
+        return 1
+    
+    # Primero simular todos: cada simulación también avanza a los demás puntos
+    errores = DiccionarioPersonalizado()
+    for empresa in sistema.empresas:
+        for punto in empresa.puntos_atencion:
+            try:
+                sistema.simular_atencion_completa(punto.id)
+            except ValueError as e:
+                errores.agregar(punto.id, str(e))
+    
+    if dir_graphviz:
+        os.makedirs(dir_graphviz, exist_ok=True)
+    
+    graphviz_faltante = []
+    
+    def graphviz(nombre, generar, identificador):
+        if graphviz_faltante:
+            return None
+        try:
+            dot = generar(identificador)
+        except ImportError as e:
+            graphviz_faltante.append(str(e))
+            return None
+        if not dir_graphviz:
+            return dot.source
+        ruta = os.path.join(dir_graphviz, nombre + '.gv')
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            archivo.write(dot.source)
+        return ruta
+    
+    reporte = {'tiempo_simulado': sistema._minuto_actual(), 'empresas': []}
+    for empresa in sistema.empresas:
+        datos_empresa = {
+            'id': empresa.id.a_texto(),
+            'nombre': empresa.nombre.a_texto(),
+            'graphviz': graphviz(f'empresa_{empresa.id.a_texto()}', sistema.generar_reporte_empresa, empresa.id),
+            'puntos': [],
+        }
+        for punto in empresa.puntos_atencion:
+            datos_empresa['puntos'].append({
+                'id': punto.id.a_texto(),
+                'nombre': punto.nombre.a_texto(),
+                'error': errores.obtener(punto.id) if punto.id in errores else None,
+                'en_espera': len(punto.clientes_en_espera),
+                'stats': _stats_para_json(sistema.calcular_tiempos_punto(punto)),
+                'escritorios': [{
+                    'id': escritorio.id.a_texto(),
+                    'identificacion': escritorio.identificacion.a_texto(),
+                    'activo': escritorio.activo,
+                    'stats': _stats_para_json(sistema.calcular_tiempos_escritorio(escritorio)),
+                } for escritorio in punto.escritorios],
+                'graphviz': graphviz(f'punto_{punto.id.a_texto()}', sistema.generar_reporte_punto_atencion, punto.id),
+            })
+        reporte['empresas'].append(datos_empresa)
+    
+    with open(salida, 'w', encoding='utf-8') as archivo:
+        json.dump(reporte, archivo, ensure_ascii=False, indent=2)
+    
+    if graphviz_faltante:
+        print(f"Estadísticas escritas en {salida}, pero no se generaron los reportes Graphviz "
+              f"({graphviz_faltante[0]}). Instale el paquete 'graphviz' para obtenerlos.", file=sys.stderr)
+        return 2
+    return 0
+
+def main(argv=None):
+    """Sin argumentos abre la interfaz gráfica; `simulate` corre sin pantalla."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        _importar_interfaz()
+        root = tk.Tk()
+        app = MobileAppSimulator(root)
+        root.mainloop()
+        return 0
+    
+    import argparse
+    parser = argparse.ArgumentParser(prog='Proyecto2.py', description='Sistema de Atención a Clientes')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    simular = comandos.add_parser('simulate', help='Simula todos los puntos sin interfaz gráfica')
+    simular.add_argument('--config', required=True, help='XML de configuración')
+    simular.add_argument('--state', required=True, help='XML de estado inicial')
+    simular.add_argument('--out', required=True, help='Archivo JSON con las estadísticas')
+    simular.add_argument('--graphviz-dir', help='Carpeta para las fuentes Graphviz (por defecto van en el JSON)')
+    args = parser.parse_args(argv)
+    return simular_lote(args.config, args.state, args.out, args.graphviz_dir)
+
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = MobileAppSimulator(root)
-    root.mainloop()
+    sys.exit(main())
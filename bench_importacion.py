@@ -0,0 +1,57 @@
+"""Benchmark del tiempo de importación del núcleo de simulación.
+
+Compara, en intérpretes nuevos, `import Proyecto2` (que ya no carga Tk, PIL
+ni graphviz) con importarlo junto a las dependencias que antes se cargaban
+al inicio. Las que no estén instaladas se omiten y se indican. También
+verifica que importar el núcleo no cargue esas dependencias.
+
+    python bench_importacion.py [repeticiones]
+"""
+import importlib.util
+import os
+import subprocess
+import sys
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+DEPENDENCIAS = ('tkinter', 'tkinter.ttk', 'PIL.Image', 'PIL.ImageTk', 'graphviz',
+                'xml.etree.ElementTree', 'multiprocessing', 'tempfile')
+
+def _disponible(modulo):
+    try:
+        return importlib.util.find_spec(modulo) is not None
+    except ImportError:
+        return False
+
+def _tiempo(codigo, repeticiones):
+    """Mejor tiempo (ms) de ejecutar `codigo` en un intérprete nuevo."""
+    comando = [sys.executable, '-c',
+               'import time; _t = time.perf_counter()\n' + codigo +
+               '\nprint((time.perf_counter() - _t) * 1000)']
+    mejor = None
+    for _ in range(repeticiones + 1):  # La primera corrida genera el .pyc
+        salida = subprocess.run(comando, cwd=DIRECTORIO, check=True,
+                                capture_output=True, text=True).stdout
+        valor = float(salida.split()[-1])
+        mejor = valor if mejor is None else min(mejor, valor)
+    return mejor
+
+def main(repeticiones=10):
+    disponibles = [m for m in DEPENDENCIAS if _disponible(m)]
+    faltantes = [m for m in DEPENDENCIAS if m not in disponibles]
+
+    cargados = subprocess.run(
+        [sys.executable, '-c', 'import sys, Proyecto2; '
+         'print(" ".join(m for m in ("tkinter", "PIL", "graphviz") if m in sys.modules))'],
+        cwd=DIRECTORIO, check=True, capture_output=True, text=True).stdout.strip()
+    assert not cargados, f"El núcleo cargó {cargados}"
+
+    nucleo = _tiempo('import Proyecto2', repeticiones)
+    completo = _tiempo('\n'.join(f'import {m}' for m in disponibles) + '\nimport Proyecto2', repeticiones)
+    print(f"núcleo (import Proyecto2): {nucleo:.1f} ms")
+    print(f"con las dependencias de interfaz y reportes: {completo:.1f} ms "
+          f"({nucleo / completo:.0%} del tiempo)")
+    if faltantes:
+        print("no instaladas (omitidas): " + ", ".join(faltantes))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
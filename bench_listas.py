@@ -0,0 +1,54 @@
+"""Benchmark de ListaEnlazada: agregar al final debe escalar en forma lineal.
+
+Mide cuánto tarda agregar n elementos para varios n y el costo por
+elemento; con el puntero a la cola ese costo se mantiene constante.
+
+    python bench_listas.py
+"""
+import time
+
+from Proyecto2 import ListaEnlazada
+
+TAMANOS = (10000, 20000, 50000, 100000)
+
+def medir_agregar(n, repeticiones=3):
+    """Mejor tiempo (en segundos) de agregar n enteros a una lista vacía."""
+    mejor = None
+    for _ in range(repeticiones):
+        lista = ListaEnlazada()
+        inicio = time.perf_counter()
+        for i in range(n):
+            lista.agregar(i)
+        transcurrido = time.perf_counter() - inicio
+        assert len(lista) == n
+        if mejor is None or transcurrido < mejor:
+            mejor = transcurrido
+    return mejor
+
+def medir_extremos(n):
+    """Tiempo de n pop(-1) y n len() sobre una lista de n elementos."""
+    lista = ListaEnlazada()
+    lista.agregar_varios(range(n))
+    inicio = time.perf_counter()
+    for _ in range(n):
+        len(lista)
+    largo = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for _ in range(n):
+        lista.pop(-1)
+    extraer = time.perf_counter() - inicio
+    return largo, extraer
+
+def main():
+    print(f"{'n':>8} {'agregar':>10} {'por elemento':>14}")
+    base = None
+    for n in TAMANOS:
+        segundos = medir_agregar(n)
+        por_elemento = segundos / n * 1e9
+        base = base or por_elemento
+        print(f"{n:>8} {segundos * 1000:>8.1f} ms {por_elemento:>10.0f} ns ({por_elemento / base:.2f}x)")
+    largo, extraer = medir_extremos(TAMANOS[-1])
+    print(f"{TAMANOS[-1]} len(): {largo * 1000:.1f} ms, {TAMANOS[-1]} pop(-1): {extraer * 1000:.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark de admisión: asignar_clientes_lote frente a asignar_cliente uno a uno.
+
+Admite 10k clientes en un punto con 8 escritorios activos por ambos
+caminos y verifica que dejen las mismas esperas y la misma cola.
+
+    python bench_lote.py [cantidad]
+"""
+import random
+import sys
+import time
+
+from Proyecto2 import (Cliente, Empresa, EscritorioServicio, MiNumero, MiString,
+                       PuntoAtencion, SistemaAtencion, Transaccion)
+
+def armar_sistema(cantidad, escritorios=8, semilla=5):
+    """Sistema con un punto y `cantidad` clientes listos para admitir."""
+    azar = random.Random(semilla)
+    sistema = SistemaAtencion()
+    empresa = Empresa(MiString("E1"), MiString("Empresa"), MiString("E"))
+    sistema.agregar_empresa(empresa)
+    punto = PuntoAtencion(MiString("P1"), MiString("Punto"), MiString("Zona 1"))
+    sistema.agregar_punto(empresa, punto)
+    for i in range(escritorios):
+        escritorio = EscritorioServicio(MiString(f"D{i}"), MiString(f"ESC-{i}"), MiString("Encargado"))
+        sistema.agregar_escritorio(punto, escritorio)
+        sistema.activar_escritorio(escritorio)
+    transacciones = [Transaccion(MiString(f"T{i}"), MiString(f"Trans {i}"), MiNumero(i + 1)) for i in range(5)]
+    for transaccion in transacciones:
+        sistema.agregar_transaccion(empresa, transaccion)
+    clientes = []
+    for i in range(cantidad):
+        cliente = Cliente(MiString(str(i)), MiString(f"Cliente {i}"))
+        cliente.agregar_transaccion(azar.choice(transacciones), azar.randint(1, 3))
+        clientes.append(cliente)
+    return sistema, punto, clientes
+
+def main(cantidad=10000):
+    sistema, punto, clientes = armar_sistema(cantidad)
+    inicio = time.perf_counter()
+    uno_a_uno = [sistema.asignar_cliente(punto, cliente) for cliente in clientes]
+    tiempo_uno = time.perf_counter() - inicio
+
+    sistema_lote, punto_lote, clientes_lote = armar_sistema(cantidad)
+    inicio = time.perf_counter()
+    lote = sistema_lote.asignar_clientes_lote(punto_lote, clientes_lote)
+    tiempo_lote = time.perf_counter() - inicio
+
+    # Los tickets son aleatorios; esperas, atenciones y cola deben coincidir
+    assert [r[1:] for r in uno_a_uno] == [r[1:] for r in lote]
+    assert ([c.dpi.a_texto() for c in punto.clientes_en_espera]
+            == [c.dpi.a_texto() for c in punto_lote.clientes_en_espera])
+
+    print(f"{cantidad} clientes: uno a uno {tiempo_uno * 1000:.0f} ms "
+          f"({cantidad / tiempo_uno:.0f} clientes/s), lote {tiempo_lote * 1000:.0f} ms "
+          f"({cantidad / tiempo_lote:.0f} clientes/s), {tiempo_uno / tiempo_lote:.1f}x")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,68 @@
+"""Benchmark de memoria por objeto de MiNumero, MiCaracter y MiString.
+
+Las capacidades de cada clase viven en su registro METODOS (un frozenset
+de clase), así que las instancias no cargan una lista de métodos. Para
+comparar, se reproduce también la organización anterior: cada instancia
+con su propia ListaEnlazada de nombres de métodos y tiene_metodo
+recorriéndola.
+
+    python bench_memoria.py
+"""
+import time
+import tracemalloc
+
+from Proyecto2 import ListaEnlazada, MiCaracter, MiNumero, MiString
+
+CANTIDAD = 2000
+
+def bytes_por_objeto(fabrica, cantidad=CANTIDAD):
+    """Memoria promedio (tracemalloc) que retiene cada objeto creado por fabrica."""
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    objetos = [fabrica(i) for i in range(cantidad)]
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objetos
+    return (despues - antes) / cantidad
+
+def con_lista_de_metodos(fabrica):
+    """Fábrica que además arma la lista de métodos por instancia que se usaba antes."""
+    def crear(i):
+        objeto = fabrica(i)
+        metodos = ListaEnlazada()
+        for nombre in sorted(type(objeto).METODOS):
+            metodos.agregar(nombre)
+        return objeto, metodos
+    return crear
+
+def tiene_metodo_lineal(metodos, nombre):
+    for actual in metodos:
+        if actual == nombre:
+            return True
+    return False
+
+def main():
+    fabricas = (
+        ('MiNumero', lambda i: MiNumero(i)),
+        ('MiCaracter', lambda i: MiCaracter('a')),
+        ('MiString (13)', lambda i: MiString('1234567890123')),
+    )
+    print(f"{'objeto':<15} {'lista por instancia':>20} {'registro de clase':>18}")
+    for nombre, fabrica in fabricas:
+        anterior = bytes_por_objeto(con_lista_de_metodos(fabrica))
+        actual = bytes_por_objeto(fabrica)
+        print(f"{nombre:<15} {anterior:>18.0f} B {actual:>16.0f} B")
+
+    numero, metodos = con_lista_de_metodos(lambda i: MiNumero(i))(0)
+    inicio = time.perf_counter()
+    for _ in range(100000):
+        tiene_metodo_lineal(metodos, '__ne__')
+    anterior = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for _ in range(100000):
+        numero.tiene_metodo('__ne__')
+    actual = time.perf_counter() - inicio
+    print(f"100k tiene_metodo('__ne__'): lista {anterior * 1000:.0f} ms, registro {actual * 1000:.0f} ms")
+
+if __name__ == '__main__':
+    main()